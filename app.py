@@ -3,217 +3,207 @@ GitLab GenAI Chatbot with Advanced Features
 A sophisticated chatbot with dynamic updates, transparency features, and analytics.
 """
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
 import google.generativeai as genai
-from typing import List, Dict, Any, Tuple
-import os
-import json
-from datetime import datetime, timedelta
-from config import settings
-from enhanced_gitlab_service import get_gitlab_service
+from google.generativeai import client as genai_client
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+import functools
+import html
+import re
+import threading
+import orjson
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from config import get_settings
+from enhanced_gitlab_service import get_gitlab_service, FOLLOWUP_CONTEXT_CHARS
+from response_cache import ResponseCache
+from semantic_cache import SemanticCache
 
 # Configure logging
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Page configuration
-st.set_page_config(
-    page_title="GitLab GenAI Chatbot",
-    page_icon="🚀",
-    layout="wide",
-    initial_sidebar_state="expanded"
+settings = get_settings()
+
+# Keywords used to tag user queries with topics for analytics
+TOPIC_KEYWORDS = {
+    "onboarding": ["onboarding", "new hire", "welcome", "start", "join"],
+    "culture": ["culture", "values", "transparency", "collaboration"],
+    "remote_work": ["remote", "work from home", "distributed", "async"],
+    "performance": ["performance", "review", "feedback", "development"],
+    "product": ["product", "strategy", "direction", "roadmap"],
+    "hiring": ["hiring", "interview", "recruitment", "candidate"],
+    "management": ["management", "manager", "leadership", "team"]
+}
+
+# One pass over the query finds every topic; the lookahead lets overlapping
+# keywords such as "interview" and "review" both match
+_TOPIC_RE = re.compile("(?=(?:{}))".format("|".join(
+    f"(?P<{topic}>{'|'.join(map(re.escape, keywords))})"
+    for topic, keywords in TOPIC_KEYWORDS.items()
+)))
+
+# Readable source titles, matched in order against the source URL
+_TITLE_RULES = (
+    ("onboarding", "GitLab Onboarding Guide"),
+    ("values", "GitLab Values & Culture"),
+    ("remote", "Remote Work at GitLab"),
+    ("performance", "Performance Management"),
+    ("direction", "GitLab Product Direction"),
 )
 
-# Custom CSS
-st.markdown("""
-<style>
-    :root {
-        --accent: #FC6D26;
-        --accent-2: #4285f4;
-        --success: #28a745;
-        --warning: #ffc107;
-        --danger: #dc3545;
-        --text-muted: #666666;
-        --surface: #f8f9fa;
-        --soft: #f0f2f6;
-        --info-bg: #e9f5ff;
-        --info-bd: #b3e0ff;
-        --warn-bg: #fff4e5;
-        --warn-bd: #ffd199;
-        --shadow: 0 2px 6px rgba(0,0,0,0.06);
-        --border-radius: 12px;
-    }
+# Characters of each recent message quoted back in the prompt; the snippet is
+# stored on the message as "_short" when it is added to the history
+HISTORY_SNIPPET_CHARS = 200
 
-    @media (prefers-color-scheme: dark) {
-        :root {
-            --text-muted: #a3a3a3;
-            --surface: #1f2937;
-            --soft: #111827;
-            --info-bg: #0b2537;
-            --info-bd: #1f4a6e;
-            --warn-bg: #3b2a17;
-            --warn-bd: #7a4b15;
-            --shadow: 0 2px 10px rgba(0,0,0,0.25);
-        }
-        
-        .notice.info { 
-            background: linear-gradient(135deg, #1e293b 0%, #334155 100%);
-            border: 2px solid var(--accent);
-            color: #e2e8f0;
-        }
-        .notice.warning { 
-            background: linear-gradient(135deg, #451a03 0%, #78350f 100%);
-            border: 2px solid var(--warning);
-            color: #fbbf24;
-        }
-        .notice.tip { 
-            background: linear-gradient(135deg, #14532d 0%, #166534 100%);
-            border: 2px solid var(--success);
-            color: #bbf7d0;
-        }
-    }
+# Follow-up questions share the response cache, keyed by the answer they were generated for
+FOLLOWUP_CACHE_PREFIX = "followups:"
 
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        background: linear-gradient(45deg, var(--accent), var(--accent-2));
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        text-align: center;
-        margin-bottom: 1rem;
-    }
+# Stands in for the export time in the cached JSON export; metadata is serialized
+# first, so the first occurrence is always the metadata field
+EXPORT_TIMESTAMP_PLACEHOLDER = "{export_timestamp}"
+EXPORT_TIMESTAMP_SLOT = orjson.dumps(EXPORT_TIMESTAMP_PLACEHOLDER)
 
-    .subheader {
-        text-align: center;
-        margin-bottom: 2rem;
-        color: var(--text-muted);
-    }
+# Parallel Gemini calls while answering a queued topic batch
+BATCH_WORKER_THREADS = 4
 
-    .chat-message {
-        padding: 1.2rem;
-        border-radius: var(--border-radius);
-        margin-bottom: 1rem;
-        border-left: 4px solid var(--accent);
-        background: var(--surface);
-        box-shadow: var(--shadow);
-        position: relative;
-    }
-    
-    .user-message {
-        background-color: var(--soft);
-        border-left-color: var(--accent);
-    }
-    
-    .assistant-message {
-        background-color: var(--info-bg);
-        border-left-color: var(--accent-2);
-    }
-    
-    .confidence-indicator {
-        position: absolute;
-        top: 1rem;
-        right: 1rem;
-        font-size: 0.8rem;
-        padding: 0.3rem 0.6rem;
-        border-radius: 20px;
-        font-weight: bold;
-    }
-    
-    .confidence-high { background: var(--success); color: white; }
-    .confidence-medium { background: var(--warning); color: black; }
-    .confidence-low { background: var(--danger); color: white; }
-    
-    .source-link {
-        color: var(--accent);
-        text-decoration: none;
-        font-size: 0.9rem;
-    }
-    .source-link:hover { text-decoration: underline; }
-
-    .followup-question {
-        background: var(--soft);
-        border: 1px solid #ddd;
-        border-radius: 8px;
-        padding: 0.8rem;
-        margin: 0.3rem 0;
-        cursor: pointer;
-        transition: all 0.2s;
-    }
-    .followup-question:hover {
-        background: var(--info-bg);
-        border-color: var(--accent);
-        transform: translateY(-1px);
-    }
+# Shown when a response could not be generated
+ERROR_RESPONSE_TEXT = "I apologize, but I encountered an error while generating a response. Please try again."
+ERROR_FOLLOWUP_QUESTIONS = ("Can you try rephrasing your question?", "What specific aspect interests you?")
 
-    .stats-card {
-        background: var(--surface);
-        padding: 1rem;
-        border-radius: var(--border-radius);
-        box-shadow: var(--shadow);
-        text-align: center;
-    }
+# Static instructions come first so requests share a long, cacheable prefix
+SYSTEM_PROMPT = """You are a helpful AI assistant for GitLab. Answer the user's question using the provided context.
 
-    .notice {
-        padding: 1.5rem;
-        border-radius: var(--border-radius);
-        border: 1px solid transparent;
-        box-shadow: var(--shadow);
-        margin: 1rem 0;
-    }
-    .notice.center { text-align: center; }
-    .notice.info { 
-        background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%);
-        border: 2px solid var(--accent);
-        color: #1a202c;
-    }
-    .notice.warning { 
-        background: linear-gradient(135deg, #fffbf0 0%, #fef5e7 100%);
-        border: 2px solid var(--warning);
-        color: #744210;
-    }
-    .notice.tip { 
-        background: linear-gradient(135deg, #f0fff4 0%, #dcfce7 100%);
-        border: 2px solid var(--success);
-        color: #14532d;
-    }
-    .notice h3, .notice h4 { margin: 0 0 .5rem 0; }
-    
-    .update-banner {
-        background: linear-gradient(45deg, var(--accent), var(--accent-2));
-        color: white;
-        padding: 0.5rem 1rem;
-        border-radius: var(--border-radius);
-        margin-bottom: 1rem;
-        text-align: center;
-    }
-</style>
-""", unsafe_allow_html=True)
+Guidelines:
+1. Provide specific, detailed answers based on the GitLab context
+2. Be helpful and professional
+3. Reference conversation history if this is a follow-up question
+4. Focus on GitLab-specific information
+5. If context has low relevance scores, acknowledge uncertainty
+6. Organize your response clearly with proper formatting
+"""
+
+# Order: static preamble, retrieved context, conversation, then the per-query parts
+PROMPT_TEMPLATE = SYSTEM_PROMPT + """
+Context from GitLab documentation:
+{context}
+{conversation_history}
+Relevance scores for this question: {relevance}
+
+Current User Question: {query}
+
+Answer:
+"""
+
+# Avatars shown next to each chat bubble
+CHAT_AVATARS = {"user": "👤", "assistant": "🤖"}
+
+# Leading "*" bullet (but not "**" bold) at the start of any line
+_BULLET_RE = re.compile(r"^[ \t]*\*(?!\*)[ \t]*", re.MULTILINE)
+
+# Page configuration
+st.set_page_config(
+    page_title="GitLab GenAI Chatbot",
+    page_icon="🚀",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS lives in static/styles.css
+CSS_PATH = Path(__file__).parent / "static" / "styles.css"
+
+@st.cache_data(show_spinner=False)
+def load_css() -> str:
+    """Read and minify the stylesheet once per process"""
+    css = re.sub(r"/\*.*?\*/", "", CSS_PATH.read_text(encoding="utf-8"), flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{}:;,])\s*", r"\1", css).strip()
+
+# Session state defaults; mutable values are factories so they are only
+# allocated when a key is actually missing
+SESSION_DEFAULTS = {
+    'chat_history': lambda: deque(maxlen=settings.max_chat_history),
+    'model': None,
+    'api_key_set': False,
+    'custom_api_key': "",
+    'conversation_stats': lambda: {'total_queries': 0, 'topics_discussed': set()},
+    'show_sources': True,
+    'show_confidence': True,
+    'show_followups': True,
+    'pending_batch': list
+}
 
 # Initialize session state with features
 def initialize_session_state():
     """Initialize all session state variables"""
-    defaults = {
-        'chat_history': [],
-        'model': None,
-        'api_key_set': False,
-        'custom_api_key': "",
-        'conversation_stats': {'total_queries': 0, 'topics_discussed': set()},
-        'show_sources': True,
-        'show_confidence': True,
-        'show_followups': True
-    }
+    if st.session_state.get('session_initialized'):
+        return
 
-    for key, default_value in defaults.items():
+    for key, default_value in SESSION_DEFAULTS.items():
         if key not in st.session_state:
-            st.session_state[key] = default_value
+            st.session_state[key] = default_value() if callable(default_value) else default_value
 
-    # Fix topics_discussed if it's not a set
+    # Fix topics_discussed if it's not a set (e.g. restored from JSON)
     if not isinstance(st.session_state.conversation_stats['topics_discussed'], set):
         st.session_state.conversation_stats['topics_discussed'] = set(st.session_state.conversation_stats['topics_discussed'])
 
+    st.session_state.session_initialized = True
+
+@st.cache_resource(show_spinner=False)
+def _get_genai_lock() -> threading.Lock:
+    """Process-wide lock around genai.configure(), whose API key is global"""
+    return threading.Lock()
+
+@st.cache_resource(show_spinner=False)
+def _get_model(api_key: str):
+    """Build the Gemini model once per API key and share it across sessions."""
+    with _get_genai_lock():
+        genai.configure(api_key=api_key)
+        generative_client = genai_client.get_default_generative_client()
+
+    # Bind the client now; left unset, the model would pick one up on first use
+    # from whichever key another session configured last
+    model = genai.GenerativeModel("gemini-1.5-flash")
+    model._client = generative_client
+    return model
+
+@st.cache_resource(show_spinner=False)
+def _get_executor() -> ThreadPoolExecutor:
+    """Shared worker pool for running Gemini calls alongside the main script"""
+    return ThreadPoolExecutor(max_workers=settings.gemini_worker_threads, thread_name_prefix="gemini")
+
+@st.cache_resource(show_spinner=False)
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache of generated answers keyed by prompt, kept on disk across restarts"""
+    return ResponseCache(
+        settings.response_cache_max_entries,
+        settings.response_cache_ttl_seconds,
+        settings.response_cache_path or None
+    )
+
+@st.cache_resource(show_spinner="Loading sentence encoder…")
+def get_encoder():
+    """Load the local sentence-transformer once per process, or None if unavailable"""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logger.warning("sentence-transformers is not installed; semantic cache disabled")
+        return None
+    return SentenceTransformer(settings.semantic_cache_model)
+
+@st.cache_resource(show_spinner=False)
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Process-wide cache of answers matched by question similarity"""
+    if not settings.enable_semantic_cache:
+        return None
+    encoder = get_encoder()
+    if encoder is None:
+        return None
+    return SemanticCache(encoder, settings.semantic_cache_threshold, settings.semantic_cache_max_entries)
+
 def initialize_ai(api_key=None):
     """Initialize Google Gemini AI model with error handling."""
     try:
@@ -222,122 +212,194 @@ def initialize_ai(api_key=None):
         if not key_to_use or key_to_use == "your_google_api_key_here":
             return False, "No valid API key provided"
 
-        genai.configure(api_key=key_to_use)
-        st.session_state.model = genai.GenerativeModel("gemini-1.5-flash")
-
-        # Test the API key
-        test_response = st.session_state.model.generate_content("Hello")
-        if test_response.text:
-            st.session_state.api_key_set = True
-            return True, "AI initialized successfully"
-        else:
-            return False, "API key test failed"
+        st.session_state.model = _get_model(key_to_use)
+        st.session_state.api_key_set = True
+        return True, "AI initialized successfully"
 
     except Exception as e:
         return False, f"Error initializing AI: {str(e)}"
 
-def generate_enhanced_response(query: str) -> Tuple[str, List[Dict], List[str], str]:
-    """Generate enhanced AI response with sources, follow-ups, and confidence"""
+@st.cache_data(ttl=86400, show_spinner=False)
+def _probe_api_key(api_key: str) -> bool:
+    """List models as a cheap authenticated call; failures raise, so only valid keys are cached for a day"""
+    with _get_genai_lock():
+        genai.configure(api_key=api_key)
+        model_client = genai_client.get_default_model_client()
+
+    if next(iter(genai.list_models(client=model_client)), None) is None:
+        raise ValueError("API key test failed")
+    return True
+
+def validate_api_key(api_key: str) -> Tuple[bool, str]:
+    """Check an API key, probing each key at most once per day"""
     try:
-        # Get GitLab service
-        gitlab_service = get_gitlab_service()
+        _probe_api_key(api_key)
+        return True, "API key is valid"
 
-        # Get relevant content with scoring
-        gitlab_content = gitlab_service.get_content_for_query(query)
-
-        # Build context with relevance scores
-        context_parts = []
-        for item in gitlab_content:
-            relevance = item.get('relevance_score', 0)
-            context_parts.append(
-                f"Source: {item['source']} (Relevance: {relevance:.2f})\n"
-                f"Topic: {item.get('topic', 'General')}\n"
-                f"Content: {item['content']}\n"
-            )
-        context = "\n".join(context_parts)
-
-        # Build conversation history
-        conversation_history = ""
-        if len(st.session_state.chat_history) > 1:
-            recent_messages = st.session_state.chat_history[-4:]
-            conversation_history = "\n\nRecent conversation:\n"
-            for msg in recent_messages:
-                role = "User" if msg["role"] == "user" else "Assistant"
-                conversation_history += f"{role}: {msg['content'][:200]}...\n"
-
-        # Enhanced prompt with confidence indicators
-        prompt = f"""
-        You are a helpful AI assistant for GitLab. Answer the user's question using the provided context.
-        
-        Context from GitLab documentation (with relevance scores):
-        {context}
-        
-        {conversation_history}
-        
-        Current User Question: {query}
-        
-        Guidelines:
-        1. Provide specific, detailed answers based on the GitLab context
-        2. Be helpful and professional
-        3. Reference conversation history if this is a follow-up question
-        4. Focus on GitLab-specific information
-        5. If context has low relevance scores, acknowledge uncertainty
-        6. Organize your response clearly with proper formatting
-        
-        Answer:
-        """
-
-        # Generate response
-        response = st.session_state.model.generate_content(prompt)
-        response_text = response.text
-
-        # Generate follow-up questions
-        followup_questions = gitlab_service.generate_followup_questions(
-            response_text, query, st.session_state.model
+    except Exception as e:
+        return False, f"Error validating API key: {str(e)}"
+
+def build_enhanced_prompt(gitlab_service, query: str, gitlab_content: List[Dict]) -> str:
+    """Build the Gemini prompt from retrieved content and recent conversation"""
+    # One block per topic in sorted order, so the same retrieval yields a byte-identical prefix
+    items_by_topic = {item.get('topic', 'General'): item for item in gitlab_content}
+    context_blocks = gitlab_service.context_blocks
+    context = "\n".join([
+        context_blocks.get(topic)
+        or f"Source: {item['source']}\nTopic: {topic}\nContent: {item['content']}\n"
+        for topic, item in sorted(items_by_topic.items())
+    ])
+    relevance = ", ".join(
+        f"{item.get('topic', 'General')}={item.get('relevance_score', 0):.2f}"
+        for item in gitlab_content
+    )
+
+    # Build conversation history
+    conversation_history = ""
+    if len(st.session_state.chat_history) > 1:
+        conversation_history = "\nRecent conversation:\n" + "".join([
+            f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['_short']}...\n"
+            for msg in recent_messages(4)
+        ])
+
+    return PROMPT_TEMPLATE.format(
+        context=context,
+        conversation_history=conversation_history,
+        relevance=relevance,
+        query=query
+    )
+
+def conversation_key() -> str:
+    """Identify the recent conversation a new question is being asked in"""
+    return "\n".join(
+        f"{msg['role']}: {msg['_short']}" for msg in recent_messages(3)
+    )
+
+def semantic_context_key(history_key: str, gitlab_content: List[Dict]) -> str:
+    """Scope semantic matches to the conversation and to the topics retrieved for the question"""
+    topics = sorted({item['topic'] for item in gitlab_content})
+    return ",".join(topics) + "\n" + history_key
+
+def recent_messages(count: int) -> List[Dict[str, Any]]:
+    """Return the last few messages in order; the history deque cannot be sliced"""
+    return list(islice(reversed(st.session_state.chat_history), count))[::-1]
+
+def find_cached_response(query: str, prompt: str, context_key: str) -> Tuple[Optional[str], Any]:
+    """Look up an answer by exact prompt, then by question similarity.
+
+    Returns the cached answer (or None) and the query embedding so a miss can be stored
+    without encoding the question twice.
+    """
+    # Identical prompts (same question, context, and history) reuse the earlier answer
+    cached_response = get_response_cache().get(prompt)
+    if cached_response is not None:
+        return cached_response, None
+
+    semantic_cache = get_semantic_cache()
+    if semantic_cache is None:
+        return None, None
+
+    embedding = semantic_cache.encode(query)
+    return semantic_cache.lookup(embedding, context_key), embedding
+
+def store_response(prompt: str, response_text: str, context_key: str, embedding: Any):
+    """Remember a generated answer in the exact and semantic caches"""
+    get_response_cache().set(prompt, response_text)
+    if embedding is not None:
+        get_semantic_cache().add(embedding, context_key, response_text)
+
+def find_cached_followups(response_text: str) -> Optional[List[str]]:
+    """Return the follow-up questions stored with an answer, so a cache hit skips the Gemini call"""
+    cached = get_response_cache().get(FOLLOWUP_CACHE_PREFIX + response_text)
+    return None if cached is None else orjson.loads(cached)
+
+def store_followups(response_text: str, followup_questions: List[str]):
+    """Remember the follow-up questions generated for an answer alongside it"""
+    if followup_questions:
+        get_response_cache().set(
+            FOLLOWUP_CACHE_PREFIX + response_text, orjson.dumps(followup_questions).decode("utf-8")
         )
 
-        # Calculate confidence
-        confidence_level, confidence_icon = gitlab_service.get_response_confidence(
-            query, gitlab_content
+def stream_enhanced_response(gitlab_service, query: str, gitlab_content: List[Dict],
+                             history_key: str) -> Iterator[str]:
+    """Stream the AI response text chunk by chunk as Gemini generates it"""
+    prompt = build_enhanced_prompt(gitlab_service, query, gitlab_content)
+    context_key = semantic_context_key(history_key, gitlab_content)
+
+    cached_response, embedding = find_cached_response(query, prompt, context_key)
+    if cached_response is not None:
+        yield cached_response
+        return
+
+    chunks = []
+    response = st.session_state.model.generate_content(prompt, stream=True)
+    for chunk in response:
+        chunks.append(chunk.text)
+        yield chunk.text
+
+    store_response(prompt, "".join(chunks), context_key, embedding)
+
+def finalize_enhanced_response(gitlab_service, query: str, response_text: str,
+                               gitlab_content: List[Dict],
+                               followup_future: Optional[Future] = None) -> Tuple[List[Dict], List[str], str]:
+    """Compute sources, follow-ups, and confidence once the response is complete"""
+    # Generate follow-up questions in the background while scoring runs here
+    cached_followups = None
+    if followup_future is None:
+        cached_followups = find_cached_followups(response_text)
+    if followup_future is None and cached_followups is None:
+        followup_future = _get_executor().submit(
+            gitlab_service.generate_followup_questions,
+            response_text, query, st.session_state.model
         )
 
-        # Prepare sources with metadata
-        sources_with_metadata = []
-        for item in gitlab_content:
-            sources_with_metadata.append({
-                'url': item['source'],
-                'title': extract_title_from_url(item['source']),
-                'relevance_score': item.get('relevance_score', 0),
-                'confidence': item.get('confidence', 0),
-                'last_updated': item.get('last_updated', 'Unknown'),
-                'topic': item.get('topic', 'General')
-            })
+    # Calculate confidence
+    confidence_level, confidence_icon = gitlab_service.get_response_confidence(
+        query, gitlab_content
+    )
+
+    # Prepare sources with metadata
+    sources_with_metadata = []
+    for item in gitlab_content:
+        sources_with_metadata.append({
+            'url': item['source'],
+            'title': extract_title_from_url(item['source']),
+            'relevance_score': item.get('relevance_score', 0),
+            'confidence': item.get('confidence', 0),
+            'last_updated': item.get('last_updated', 'Unknown'),
+            'topic': item.get('topic', 'General')
+        })
+
+    if cached_followups is not None:
+        return sources_with_metadata, cached_followups, confidence_level
 
-        return response_text, sources_with_metadata, followup_questions, confidence_level
+    try:
+        followup_questions = followup_future.result(timeout=settings.request_timeout)
+    except FutureTimeoutError:
+        logger.warning("Timed out waiting for follow-up questions")
+        # Frees the worker if the call has not started yet
+        followup_future.cancel()
+        followup_questions = []
+    store_followups(response_text, followup_questions)
 
-    except Exception as e:
-        logger.error(f"Error generating enhanced response: {e}")
-        return (
-            "I apologize, but I encountered an error while generating a response. Please try again.",
-            [],
-            ["Can you try rephrasing your question?", "What specific aspect interests you?"],
-            "Low"
-        )
+    return sources_with_metadata, followup_questions, confidence_level
 
+@functools.lru_cache(maxsize=4096)
 def extract_title_from_url(url: str) -> str:
     """Extract a readable title from GitLab URL"""
-    if "onboarding" in url:
-        return "GitLab Onboarding Guide"
-    elif "values" in url:
-        return "GitLab Values & Culture"
-    elif "remote" in url:
-        return "Remote Work at GitLab"
-    elif "performance" in url:
-        return "Performance Management"
-    elif "direction" in url:
-        return "GitLab Product Direction"
-    else:
-        return "GitLab Handbook"
+    for fragment, title in _TITLE_RULES:
+        if fragment in url:
+            return title
+    return "GitLab Handbook"
+
+def render_sources_html(sources: List[Dict]) -> str:
+    """Render a message's sources as one HTML block instead of a widget row per source"""
+    items = "".join(
+        f'<li><a class="source-link" href="{html.escape(source["url"])}" target="_blank">{html.escape(source["title"])}</a>'
+        f'<span class="rel">Relevance: {source.get("relevance_score", 0):.1f}</span></li>'
+        for source in sources
+    )
+    return f'<div class="sources"><strong>📚 Sources:</strong><ul>{items}</ul></div>'
 
 def display_enhanced_chat_history():
     """Display chat history with enhanced features"""
@@ -349,72 +411,31 @@ def display_enhanced_chat_history():
     for i, message in enumerate(st.session_state.chat_history):
         is_user = message["role"] == "user"
 
-        # Use columns for better layout
-        col1, col2 = st.columns([1, 12])
-
-        with col1:
-            if is_user:
-                st.markdown("👤")
-            else:
-                st.markdown("🤖")
-
-        with col2:
-            # Create container for each message
-            with st.container():
-                # Message header with role and confidence
-                if is_user:
-                    st.markdown("**You**")
+        with st.chat_message(message["role"], avatar=CHAT_AVATARS[message["role"]]):
+            # Confidence badge for assistant messages
+            if not is_user and st.session_state.show_confidence and 'confidence_level' in message:
+                confidence = message['confidence_level']
+                if confidence == "High":
+                    st.markdown('<span style="background: #28a745; color: white; padding: 0.2rem 0.5rem; border-radius: 10px; font-size: 0.8rem; font-weight: bold;">🎯 High</span>', unsafe_allow_html=True)
+                elif confidence == "Medium":
+                    st.markdown('<span style="background: #ffc107; color: black; padding: 0.2rem 0.5rem; border-radius: 10px; font-size: 0.8rem; font-weight: bold;">⚖️ Medium</span>', unsafe_allow_html=True)
                 else:
-                    header_cols = st.columns([3, 1])
-                    with header_cols[0]:
-                        st.markdown("**GitLab Assistant**")
-                    with header_cols[1]:
-                        if st.session_state.show_confidence and 'confidence_level' in message:
-                            confidence = message['confidence_level']
-                            if confidence == "High":
-                                st.markdown('<span style="background: #28a745; color: white; padding: 0.2rem 0.5rem; border-radius: 10px; font-size: 0.8rem; font-weight: bold;">🎯 High</span>', unsafe_allow_html=True)
-                            elif confidence == "Medium":
-                                st.markdown('<span style="background: #ffc107; color: black; padding: 0.2rem 0.5rem; border-radius: 10px; font-size: 0.8rem; font-weight: bold;">⚖️ Medium</span>', unsafe_allow_html=True)
-                            else:
-                                st.markdown('<span style="background: #dc3545; color: white; padding: 0.2rem 0.5rem; border-radius: 10px; font-size: 0.8rem; font-weight: bold;">⚠️ Low</span>', unsafe_allow_html=True)
-
-                # Message content
-                content = message['content']
-
-                # For assistant messages, format the content better
-                if not is_user:
-                    # Replace **text** with proper markdown bold
-                    content = content.replace('**', '**')
-                    # Handle bullet points properly
-                    lines = content.split('\n')
-                    formatted_lines = []
-                    for line in lines:
-                        line = line.strip()
-                        if line.startswith('*') and not line.startswith('**'):
-                            # Convert * to proper bullet
-                            formatted_lines.append(f"• {line[1:].strip()}")
-                        else:
-                            formatted_lines.append(line)
-                    content = '\n'.join(formatted_lines)
-
-                st.markdown(content)
-
-                # Add sources for assistant messages
-                if not is_user and st.session_state.show_sources and 'sources' in message:
-                    sources = message['sources']
-                    if sources:
-                        st.markdown("---")
-                        st.markdown("**📚 Sources:**")
-                        for source in sources:
-                            relevance = source.get('relevance_score', 0)
-                            col_source1, col_source2 = st.columns([4, 1])
-                            with col_source1:
-                                st.markdown(f"[{source['title']}]({source['url']})")
-                            with col_source2:
-                                st.caption(f"Relevance: {relevance:.1f}")
-
-        # Add some spacing between messages
-        st.markdown("---")
+                    st.markdown('<span style="background: #dc3545; color: white; padding: 0.2rem 0.5rem; border-radius: 10px; font-size: 0.8rem; font-weight: bold;">⚠️ Low</span>', unsafe_allow_html=True)
+
+            # Message content
+            content = message['content']
+
+            # For assistant messages, convert * bullets to proper bullets
+            if not is_user:
+                content = _BULLET_RE.sub("• ", content)
+
+            st.markdown(content)
+
+            # Add sources for assistant messages
+            if not is_user and st.session_state.show_sources and 'sources' in message:
+                sources = message['sources']
+                if sources:
+                    st.markdown(render_sources_html(sources), unsafe_allow_html=True)
 
         # Add follow-up questions for the latest assistant message
         if (not is_user and st.session_state.show_followups and
@@ -426,34 +447,37 @@ def display_enhanced_chat_history():
 
             for j, followup in enumerate(message['followup_questions']):
                 with followup_cols[j % len(followup_cols)]:
-                    if st.button(f"❓ {followup}", key=f"followup_{i}_{j}", use_container_width=True):
-                        process_user_query(followup)
+                    st.button(f"❓ {followup}", key=f"followup_{i}_{j}", use_container_width=True,
+                              on_click=queue_user_query, args=(followup,))
 
-def process_user_query(user_input: str):
-    """Process user query and generate response"""
-    # Add user message to history
+def queue_user_query(user_input: str):
+    """Defer a query to the next run so it is not processed mid-render"""
+    st.session_state.pending_query = user_input
+
+def add_user_message(user_input: str):
+    """Append a user message to the history and count it"""
     st.session_state.chat_history.append({
         "role": "user",
         "content": user_input,
+        "_short": user_input[:HISTORY_SNIPPET_CHARS],
         "timestamp": datetime.now().isoformat()
     })
 
     # Update stats
     st.session_state.conversation_stats['total_queries'] += 1
 
-    # Generate enhanced response
-    with st.spinner("🤔 Analyzing and generating response..."):
-        response_text, sources, followup_questions, confidence_level = generate_enhanced_response(user_input)
-
+def add_assistant_message(user_input: str, response_text: str, sources: List[Dict],
+                          followup_questions: List[str], confidence_level: str):
+    """Append an assistant response with its metadata and record its topics"""
     # Extract topics for stats
     topics = extract_topics_from_query(user_input)
-    for topic in topics:
-        st.session_state.conversation_stats['topics_discussed'].add(topic)
+    st.session_state.conversation_stats['topics_discussed'].update(topics)
 
     # Add assistant response with enhanced metadata
     st.session_state.chat_history.append({
         "role": "assistant",
         "content": response_text,
+        "_short": response_text[:HISTORY_SNIPPET_CHARS],
         "sources": sources,
         "followup_questions": followup_questions,
         "confidence_level": confidence_level,
@@ -461,26 +485,131 @@ def process_user_query(user_input: str):
         "topics": topics
     })
 
+def process_user_query(user_input: str):
+    """Process user query and generate response"""
+    history_key = conversation_key()
+    add_user_message(user_input)
+    with st.chat_message("user", avatar=CHAT_AVATARS["user"]):
+        st.markdown(user_input)
+
+    followup_future = None
+    try:
+        gitlab_service = get_gitlab_service()
+        gitlab_content = gitlab_service.get_content_for_query(user_input)
+
+        def stream_and_start_followups() -> Iterator[str]:
+            """Pass chunks through to the page, starting follow-ups once enough text has arrived"""
+            nonlocal followup_future
+            streamed_text = ""
+            for text in stream_enhanced_response(gitlab_service, user_input, gitlab_content, history_key):
+                streamed_text += text
+
+                # Follow-ups only need the opening of the response, so start them mid-stream;
+                # a cached answer arrives whole and finalize reuses its stored follow-ups
+                if (followup_future is None and len(streamed_text) >= FOLLOWUP_CONTEXT_CHARS and
+                        find_cached_followups(streamed_text) is None):
+                    followup_future = _get_executor().submit(
+                        gitlab_service.generate_followup_questions,
+                        streamed_text, user_input, st.session_state.model
+                    )
+                yield text
+
+        with st.chat_message("assistant", avatar=CHAT_AVATARS["assistant"]):
+            # Text appears as it is generated, so first-token latency is what the user waits on
+            response_text = st.write_stream(stream_and_start_followups())
+
+            with st.spinner("💡 Preparing sources and follow-up questions..."):
+                sources, followup_questions, confidence_level = finalize_enhanced_response(
+                    gitlab_service, user_input, response_text, gitlab_content, followup_future
+                )
+
+    except Exception as e:
+        logger.error(f"Error generating enhanced response: {e}")
+        response_text = ERROR_RESPONSE_TEXT
+        sources = []
+        followup_questions = list(ERROR_FOLLOWUP_QUESTIONS)
+        confidence_level = "Low"
+
+    add_assistant_message(user_input, response_text, sources, followup_questions, confidence_level)
+
     st.rerun()
 
+def process_query_batch(queries: List[str]):
+    """Answer several queued queries with parallel Gemini calls and add them together"""
+    gitlab_service = get_gitlab_service()
+    model = st.session_state.model
+    # A batch gets its own small pool, so a long queue cannot crowd out other sessions
+    executor = ThreadPoolExecutor(max_workers=BATCH_WORKER_THREADS, thread_name_prefix="gemini-batch")
+
+    try:
+        with st.spinner(f"🤔 Answering {len(queries)} questions..."):
+            # Retrieval and cache lookups are cheap; only the misses go to Gemini, side by side
+            history_key = conversation_key()
+            prepared = []
+            for query in queries:
+                try:
+                    content = gitlab_service.get_content_for_query(query)
+                    prompt = build_enhanced_prompt(gitlab_service, query, content)
+                    context_key = semantic_context_key(history_key, content)
+                    cached_response, embedding = find_cached_response(query, prompt, context_key)
+                    response_future = (
+                        None if cached_response is not None else executor.submit(model.generate_content, prompt)
+                    )
+                    prepared.append((content, prompt, context_key, embedding, cached_response, response_future))
+                except Exception as e:
+                    logger.error(f"Error preparing batched response: {e}")
+                    prepared.append(None)
+
+            results = []
+            for query, item in zip(queries, prepared):
+                if item is None:
+                    results.append(None)
+                    continue
+
+                content, prompt, context_key, embedding, cached_response, response_future = item
+                try:
+                    if response_future is None:
+                        # finalize reuses the follow-ups cached with this answer
+                        response_text = cached_response
+                        followup_future = None
+                    else:
+                        response_text = response_future.result(timeout=settings.request_timeout).text
+                        store_response(prompt, response_text, context_key, embedding)
+                        followup_future = executor.submit(
+                            gitlab_service.generate_followup_questions, response_text, query, model
+                        )
+                    results.append((content, response_text, followup_future))
+                except Exception as e:
+                    logger.error(f"Error generating batched response: {e}")
+                    if response_future is not None:
+                        response_future.cancel()
+                    results.append(None)
+
+            # Add every question/answer pair to the history at once
+            for query, result in zip(queries, results):
+                add_user_message(query)
+                response_text = ERROR_RESPONSE_TEXT
+                sources = []
+                followup_questions = list(ERROR_FOLLOWUP_QUESTIONS)
+                confidence_level = "Low"
+                if result is not None:
+                    content, generated_text, followup_future = result
+                    try:
+                        sources, followup_questions, confidence_level = finalize_enhanced_response(
+                            gitlab_service, query, generated_text, content, followup_future
+                        )
+                        response_text = generated_text
+                    except Exception as e:
+                        logger.error(f"Error finalizing batched response: {e}")
+                add_assistant_message(query, response_text, sources, followup_questions, confidence_level)
+    finally:
+        # Futures given up on were cancelled; don't hold the page for ones already running
+        executor.shutdown(wait=False)
+
 def extract_topics_from_query(query: str) -> List[str]:
     """Extract topics from user query for analytics"""
-    query_lower = query.lower()
-    topics = []
-
-    topic_keywords = {
-        "onboarding": ["onboarding", "new hire", "welcome", "start", "join"],
-        "culture": ["culture", "values", "transparency", "collaboration"],
-        "remote_work": ["remote", "work from home", "distributed", "async"],
-        "performance": ["performance", "review", "feedback", "development"],
-        "product": ["product", "strategy", "direction", "roadmap"],
-        "hiring": ["hiring", "interview", "recruitment", "candidate"],
-        "management": ["management", "manager", "leadership", "team"]
-    }
-
-    for topic, keywords in topic_keywords.items():
-        if any(keyword in query_lower for keyword in keywords):
-            topics.append(topic)
+    found = {match.lastgroup for match in _TOPIC_RE.finditer(query.lower())}
+    topics = [topic for topic in TOPIC_KEYWORDS if topic in found]
 
     return topics if topics else ["general"]
 
@@ -496,10 +625,6 @@ def show_conversation_analytics():
     total_messages = len(st.session_state.chat_history)
     user_messages = len([m for m in st.session_state.chat_history if m["role"] == "user"])
 
-    # Ensure topics_discussed is a set
-    if not isinstance(st.session_state.conversation_stats['topics_discussed'], set):
-        st.session_state.conversation_stats['topics_discussed'] = set(st.session_state.conversation_stats['topics_discussed'])
-
     topics_discussed = list(st.session_state.conversation_stats['topics_discussed'])
 
     col1, col2, col3 = st.columns(3)
@@ -519,10 +644,11 @@ def show_conversation_analytics():
                 st.button(f"#{topic}", disabled=True, key=f"topic_tag_{i}")
 
     # Confidence distribution
-    assistant_messages = [m for m in st.session_state.chat_history if m["role"] == "assistant"]
-    if assistant_messages:
-        confidence_levels = [m.get('confidence_level', 'Medium') for m in assistant_messages]
-        confidence_counts = {level: confidence_levels.count(level) for level in ['High', 'Medium', 'Low']}
+    confidence_counts = Counter(
+        m.get('confidence_level', 'Medium')
+        for m in st.session_state.chat_history if m["role"] == "assistant"
+    )
+    if confidence_counts:
 
         st.markdown("**🎯 Response Confidence Distribution:**")
         conf_col1, conf_col2, conf_col3 = st.columns(3)
@@ -533,26 +659,44 @@ def show_conversation_analytics():
         with conf_col3:
             st.metric("⚠️ Low", confidence_counts.get('Low', 0))
 
-def export_conversation():
-    """Enhanced conversation export with analytics"""
-    if not st.session_state.chat_history:
-        st.warning("No conversation to export!")
-        return
-
-    # Ensure topics_discussed is a set and convert to list for serialization
-    if not isinstance(st.session_state.conversation_stats['topics_discussed'], set):
-        st.session_state.conversation_stats['topics_discussed'] = set(st.session_state.conversation_stats['topics_discussed'])
-
+def get_export_payloads() -> Tuple[bytes, str]:
+    """Serialize the conversation for download, reusing the last result while it is unchanged.
+
+    The cached payloads leave out the export time, which is filled in on every render.
+    """
+    history = st.session_state.chat_history
+    cache_key = (
+        len(history),
+        history[-1].get("timestamp"),
+        st.session_state.show_sources,
+        st.session_state.show_confidence,
+        st.session_state.show_followups
+    )
+    cached = st.session_state.get("export_cache")
+    if not cached or cached[0] != cache_key:
+        cached = (cache_key, *serialize_conversation())
+        st.session_state.export_cache = cached
+
+    _, json_template, text_body = cached
+    exported_at = datetime.now()
+    json_bytes = json_template.replace(EXPORT_TIMESTAMP_SLOT, orjson.dumps(exported_at.isoformat()), 1)
+    return json_bytes, create_text_export_header(exported_at) + text_body
+
+def serialize_conversation() -> Tuple[bytes, str]:
+    """Build the JSON and text exports, with a slot in place of the JSON export time"""
     # Prepare comprehensive export data
     export_data = {
         "metadata": {
-            "export_timestamp": datetime.now().isoformat(),
+            "export_timestamp": EXPORT_TIMESTAMP_PLACEHOLDER,
             "total_messages": len(st.session_state.chat_history),
             "user_messages": len([m for m in st.session_state.chat_history if m["role"] == "user"]),
             "topics_discussed": list(st.session_state.conversation_stats['topics_discussed']),
             "export_version": "2.0"
         },
-        "conversation": st.session_state.chat_history,
+        "conversation": [
+            {key: value for key, value in message.items() if not key.startswith('_')}
+            for message in st.session_state.chat_history
+        ],
         "analytics": {
             "total_queries": st.session_state.conversation_stats['total_queries'],
             "topics_discussed": list(st.session_state.conversation_stats['topics_discussed'])
@@ -564,21 +708,31 @@ def export_conversation():
         }
     }
 
-    json_str = json.dumps(export_data, indent=2, ensure_ascii=False)
+    json_template = orjson.dumps(export_data, option=orjson.OPT_INDENT_2)
+
+    # Create a simplified text version
+    return json_template, create_text_export(st.session_state.chat_history)
+
+@st.fragment
+def export_conversation():
+    """Enhanced conversation export with analytics"""
+    if not st.session_state.chat_history:
+        st.warning("No conversation to export!")
+        return
+
+    json_bytes, text_export = get_export_payloads()
 
     col1, col2 = st.columns(2)
     with col1:
         st.download_button(
             label="📄 Export as JSON",
-            data=json_str,
+            data=json_bytes,
             file_name=f"gitlab_chat_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
             mime="application/json",
             help="Complete conversation with metadata and analytics"
         )
 
     with col2:
-        # Create a simplified text version
-        text_export = create_text_export(st.session_state.chat_history)
         st.download_button(
             label="📝 Export as Text",
             data=text_export,
@@ -587,14 +741,19 @@ def export_conversation():
             help="Simplified text version for easy reading"
         )
 
-def create_text_export(chat_history: List[Dict]) -> str:
-    """Create a readable text export of the conversation"""
-    lines = [
+def create_text_export_header(generated_at: datetime) -> str:
+    """Title block of the text export, stamped with the export time"""
+    return "\n".join([
         "GitLab GenAI Chatbot Conversation Export",
-        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"Generated: {generated_at.strftime('%Y-%m-%d %H:%M:%S')}",
         "=" * 50,
+        "",
         ""
-    ]
+    ])
+
+def create_text_export(chat_history: List[Dict]) -> str:
+    """Create a readable text export of the conversation, without its header"""
+    lines = []
 
     for i, message in enumerate(chat_history, 1):
         role = "You" if message["role"] == "user" else "GitLab Assistant"
@@ -614,7 +773,27 @@ def create_text_export(chat_history: List[Dict]) -> str:
 
     return "\n".join(lines)
 
-def show_enhanced_sidebar():
+@st.fragment
+def knowledge_base_panel(gitlab_service):
+    """Knowledge base status and refresh controls, rerun independently of the page"""
+    st.markdown("### 📖 Knowledge Base")
+
+    # Check if update is needed
+    if gitlab_service.should_update():
+        st.markdown("""
+        <div class="update-banner">
+            🔄 Knowledge base can be updated
+        </div>
+        """, unsafe_allow_html=True)
+
+    if st.button("🔄 Update from GitLab"):
+        gitlab_service.update_knowledge_base_from_web()
+
+    # Show last update info; background refreshes only update the service itself
+    days_since_update = (datetime.now() - gitlab_service.last_update).days
+    st.markdown(f"**Last Updated:** {days_since_update} days ago")
+
+def show_enhanced_sidebar(gitlab_service):
     """Enhanced sidebar with all controls"""
     with st.sidebar:
         st.markdown("## 🎛️ Control Panel")
@@ -649,7 +828,7 @@ def show_enhanced_sidebar():
                 with col2:
                     if st.form_submit_button("🧪 Test Key") and api_key_input:
                         with st.spinner("Testing..."):
-                            success, message = initialize_ai(api_key_input)
+                            success, message = validate_api_key(api_key_input)
                             if success:
                                 st.success("✅ Valid!")
                                 st.session_state.custom_api_key = api_key_input
@@ -672,7 +851,7 @@ def show_enhanced_sidebar():
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("🗑️ Clear Chat"):
-                    st.session_state.chat_history = []
+                    st.session_state.chat_history.clear()
                     st.session_state.conversation_stats = {'total_queries': 0, 'topics_discussed': set()}
                     st.success("Chat cleared!")
                     st.rerun()
@@ -689,24 +868,7 @@ def show_enhanced_sidebar():
         st.session_state.show_followups = st.checkbox("💡 Show Follow-ups", value=st.session_state.show_followups)
 
         # Knowledge Base Management
-        st.markdown("### 📖 Knowledge Base")
-        gitlab_service = get_gitlab_service()
-
-        # Check if update is needed
-        if gitlab_service.should_update():
-            st.markdown("""
-            <div class="update-banner">
-                🔄 Knowledge base can be updated
-            </div>
-            """, unsafe_allow_html=True)
-
-        if st.button("🔄 Update from GitLab"):
-            gitlab_service.update_knowledge_base_from_web()
-
-        # Show last update info
-        last_update = gitlab_service.get_last_update()
-        days_since_update = (datetime.now() - last_update).days
-        st.markdown(f"**Last Updated:** {days_since_update} days ago")
+        knowledge_base_panel(gitlab_service)
 
         # System Status
         st.markdown("### 📊 System Status")
@@ -729,6 +891,11 @@ def show_enhanced_sidebar():
                 for topic in topics[:3]:
                     st.markdown(f"• {topic}")
 
+def queue_topic_query(topic: str):
+    """Add an explorer topic to the pending batch"""
+    if topic not in st.session_state.pending_batch:
+        st.session_state.pending_batch.append(topic)
+
 def show_topic_explorer():
     """Interactive topic explorer"""
     st.markdown("### 🗺️ Explore GitLab Topics")
@@ -752,19 +919,77 @@ def show_topic_explorer():
         }
     }
 
+    # Topic clicks are queued and answered together in one parallel batch
+    pending_batch = st.session_state.pending_batch
+    if pending_batch:
+        st.info("🧺 Queued: " + ", ".join(pending_batch))
+        batch_cols = st.columns(2)
+        with batch_cols[0]:
+            if st.button(f"🚀 Ask {len(pending_batch)} queued question(s)", type="primary"):
+                process_query_batch([f"Tell me about GitLab's approach to {topic}" for topic in pending_batch])
+                # Cleared only once every queued question has an answer in the history
+                st.session_state.pending_batch = []
+                st.rerun()
+        with batch_cols[1]:
+            if st.button("🗑️ Clear queue"):
+                st.session_state.pending_batch = []
+                st.rerun()
+
     for category, info in topic_categories.items():
         with st.expander(f"{category} - {info['description']}"):
             topic_cols = st.columns(2)
             for i, topic in enumerate(info['topics']):
                 with topic_cols[i % 2]:
-                    if st.button(f"💡 Learn about {topic}", key=f"explore_{topic}"):
-                        query = f"Tell me about GitLab's approach to {topic}"
-                        process_user_query(query)
+                    st.button(f"💡 Learn about {topic}", key=f"explore_{topic}",
+                              on_click=queue_topic_query, args=(topic,))
+
+@st.fragment
+def chat_input_fragment():
+    """Question input; submitting reruns only this fragment until a query is processed"""
+    user_input = st.chat_input("Ask about GitLab's culture, processes, or practices...")
+    if user_input and user_input.strip():
+        process_user_query(user_input.strip())
+
+@st.fragment
+def suggested_questions():
+    """Suggested question buttons; a click queues its question for the full page to answer"""
+    st.markdown("### 💡 Suggested Questions")
+    if len(st.session_state.chat_history) == 0:
+        # Initial suggestions
+        examples = [
+            "What makes GitLab's culture unique?",
+            "How does GitLab's onboarding process work?",
+            "What are GitLab's core values?",
+            "How does GitLab approach remote work?",
+            "What is GitLab's product strategy?"
+        ]
+    else:
+        # Context-aware suggestions
+        examples = [
+            "Can you elaborate on that?",
+            "What are the practical benefits?",
+            "How does this compare to other companies?",
+            "What challenges might arise?",
+            "Are there specific examples?"
+        ]
+
+    # Display example questions in columns
+    example_cols = st.columns(2)
+    for i, example in enumerate(examples):
+        with example_cols[i % 2]:
+            if st.button(f"❓ {example}", key=f"example_{i}",
+                         on_click=queue_user_query, args=(example,)):
+                # Queued questions are answered by a full run, below the history
+                st.rerun()
 
 def main():
     """Enhanced main application function"""
+    # Apply custom styles
+    st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
+
     # Initialize session state
     initialize_session_state()
+    gitlab_service = get_gitlab_service()
 
     # Header
     st.markdown('<h1 class="main-header">🚀 GitLab GenAI Chatbot</h1>', unsafe_allow_html=True)
@@ -775,7 +1000,7 @@ def main():
     """, unsafe_allow_html=True)
 
     # Show enhanced sidebar
-    show_enhanced_sidebar()
+    show_enhanced_sidebar(gitlab_service)
 
     # Main content area
     if st.session_state.model:
@@ -786,51 +1011,16 @@ def main():
             # Display enhanced chat history
             display_enhanced_chat_history()
 
-            # Chat input section
-            st.markdown("### 💭 Ask a Question")
-            with st.form(key="chat_form", clear_on_submit=True):
-                user_input = st.text_area(
-                    "Type your question about GitLab:",
-                    height=100,
-                    placeholder="e.g., How does GitLab handle remote team collaboration?",
-                    key="user_input"
-                )
-
-                col1, col2 = st.columns([1, 4])
-                with col1:
-                    send_button = st.form_submit_button("📤 Send", type="primary")
+            # Answer a queued follow-up or suggestion below the history it continues
+            pending_query = st.session_state.pop('pending_query', None)
+            if pending_query:
+                process_user_query(pending_query)
 
-                # Process message when form is submitted
-                if send_button and user_input.strip():
-                    process_user_query(user_input.strip())
+            # Chat input section
+            chat_input_fragment()
 
             # Example questions based on context
-            st.markdown("### 💡 Suggested Questions")
-            if len(st.session_state.chat_history) == 0:
-                # Initial suggestions
-                examples = [
-                    "What makes GitLab's culture unique?",
-                    "How does GitLab's onboarding process work?",
-                    "What are GitLab's core values?",
-                    "How does GitLab approach remote work?",
-                    "What is GitLab's product strategy?"
-                ]
-            else:
-                # Context-aware suggestions
-                examples = [
-                    "Can you elaborate on that?",
-                    "What are the practical benefits?",
-                    "How does this compare to other companies?",
-                    "What challenges might arise?",
-                    "Are there specific examples?"
-                ]
-
-            # Display example questions in columns
-            example_cols = st.columns(2)
-            for i, example in enumerate(examples):
-                with example_cols[i % 2]:
-                    if st.button(f"❓ {example}", key=f"example_{i}"):
-                        process_user_query(example)
+            suggested_questions()
 
         with tab2:
             # Analytics dashboard
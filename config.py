@@ -2,8 +2,8 @@
 Enhanced Configuration module for the GitLab GenAI Chatbot.
 Includes settings for new features like analytics, caching, and updates.
 """
-import os
-from typing import Optional, List
+import functools
+from typing import List
 from pydantic_settings import BaseSettings
 
 
@@ -20,6 +20,7 @@ class Settings(BaseSettings):
 
     # Application Configuration
     chroma_persist_directory: str = "./chroma_db"
+    knowledge_base_path: str = "./data/gitlab_knowledge.json"
     max_context_length: int = 4000
     max_chunk_size: int = 1000
     chunk_overlap: int = 200
@@ -38,8 +39,18 @@ class Settings(BaseSettings):
 
     # Performance Configuration
     request_timeout: int = 10
+    gemini_worker_threads: int = 16  # shared by every session in the process
     max_retry_attempts: int = 3
     cache_ttl_seconds: int = 3600  # 1 hour
+    response_cache_max_entries: int = 500
+    response_cache_ttl_seconds: int = 86400  # 1 day, so the saved cache outlives restarts
+    response_cache_path: str = "./cache/responses.sqlite3"  # empty keeps responses in memory only
+
+    # Semantic Cache Configuration
+    enable_semantic_cache: bool = False  # needs requirements-semantic.txt
+    semantic_cache_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_max_entries: int = 100
 
     # UI Configuration
     default_show_sources: bool = True
@@ -61,5 +72,7 @@ class Settings(BaseSettings):
         extra = "ignore"
 
 
-# Global settings instance
-settings = Settings()
\ No newline at end of file
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the shared settings instance, reading the environment and .env only once"""
+    return Settings()
\ No newline at end of file
@@ -1,37 +1,124 @@
 """
 Enhanced GitLab Service with Dynamic Updates and Smart Features
 """
-import requests
-from bs4 import BeautifulSoup
-import json
+import asyncio
+import copy
+import aiohttp
+import orjson
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+import soupsieve
+import functools
+import os
+import threading
 import streamlit as st
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
-import os
+import re
 import logging
+from config import get_settings
 
 logger = logging.getLogger(__name__)
 
-class EnhancedGitLabService:
-    def __init__(self):
-        self.knowledge_base = self.load_knowledge_base()
-        self.last_update = self.get_last_update()
-        self.update_interval = timedelta(days=7)  # Update weekly
+settings = get_settings()
 
-    def load_knowledge_base(self) -> Dict:
-        """Load knowledge base from session state or use default"""
-        if 'gitlab_knowledge_base' in st.session_state:
-            return st.session_state.gitlab_knowledge_base
+# Follow-up generation only looks at the opening of a response
+FOLLOWUP_CONTEXT_CHARS = 300
 
-        default_kb = self.get_default_knowledge_base()
-        st.session_state.gitlab_knowledge_base = default_kb
-        return default_kb
 
-    def get_default_knowledge_base(self) -> Dict:
-        """Enhanced default knowledge base with metadata"""
-        return {
-            "onboarding": {
-                "content": """
+# Word tokens for overlap scoring: runs of letters and digits, so punctuation never sticks to a word
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _tokens(text: str) -> List[str]:
+    """Split text into casefolded word tokens"""
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def _truncate_words(text: str, max_words: int) -> str:
+    """Cut text down to at most max_words whitespace-separated words"""
+    words = text.split()
+    if len(words) <= max_words:
+        return text
+    return " ".join(words[:max_words]) + "..."
+
+
+# Request headers shared by every page fetch
+_HEADERS = {
+    'User-Agent': settings.user_agent,
+    'Accept-Encoding': 'gzip, deflate'
+}
+
+
+def _is_usable_page(content: Any) -> bool:
+    """Whether scraped text is long enough to replace a knowledge base entry"""
+    return isinstance(content, str) and len(content) > 100
+
+
+# Download size per read while streaming a page
+PAGE_CHUNK_BYTES = 16 * 1024
+
+# Serializes background writes of the saved knowledge base
+_kb_write_lock = threading.Lock()
+
+# GitLab pages that refresh knowledge base entries, by topic
+KNOWLEDGE_BASE_URLS = {
+    "onboarding": "https://handbook.gitlab.com/handbook/people-group/general-onboarding/",
+    "culture": "https://handbook.gitlab.com/handbook/values/",
+    "remote_work": "https://handbook.gitlab.com/company/culture/all-remote/",
+    "performance": "https://handbook.gitlab.com/handbook/people-group/performance-and-development/"
+}
+
+# Wait before retrying a background update that refreshed nothing
+UPDATE_RETRY_SECONDS = 3600
+
+# One background updater per process: a service rebuilt after a cache clear
+# stops the previous service's thread before starting its own
+_updater_lock = threading.Lock()
+_active_updater: Optional["EnhancedGitLabService"] = None
+
+# Pages fetched at once during a knowledge base update
+MAX_CONCURRENT_FETCHES = 10
+
+# Page chrome dropped before extracting text
+_STRIPPED_TAGS = ('script', 'style', 'nav', 'header', 'footer')
+
+# Containers that hold a page's main text, tried in order; compiled once
+_CONTENT_SELECTORS = tuple(soupsieve.compile(selector) for selector in (
+    'main', '.content', '.handbook-content',
+    '.markdown-body', 'article', '.post-content'
+))
+
+
+class _MainSectionReader:
+    """Parse a page as it downloads and stop once its <main> element is complete"""
+
+    def __init__(self, charset: Optional[str] = None):
+        self._parser = etree.HTMLPullParser(events=('end',), tag='main', encoding=charset or 'utf-8')
+        self._chunks = []
+        self._main_html = None
+
+    def feed(self, chunk: bytes) -> bool:
+        """Add downloaded bytes; returns True once the rest of the page can be skipped"""
+        self._chunks.append(chunk)
+        self._parser.feed(chunk)
+        for _, element in self._parser.read_events():
+            self._main_html = etree.tostring(element, method='html')
+            return True
+        return False
+
+    def page(self) -> bytes:
+        """The <main> element if one was seen, otherwise the whole page"""
+        return self._main_html if self._main_html is not None else b"".join(self._chunks)
+
+
+# Built-in knowledge base, used until pages have been scraped; built once at import
+_DEFAULT_KB_TIMESTAMP = datetime.now().isoformat()
+DEFAULT_KNOWLEDGE_BASE = {
+    "onboarding": {
+        "content": """
                 GitLab's onboarding process for new team members includes:
                 1. Welcome call with People Operations team
                 2. Complete access to GitLab Handbook for self-paced learning
@@ -44,13 +131,13 @@ class EnhancedGitLabService:
                 9. Product overview and company strategy sessions
                 10. Continuous feedback loops and onboarding experience optimization
                 """,
-                "source": "https://handbook.gitlab.com/handbook/people-group/general-onboarding/",
-                "last_updated": datetime.now().isoformat(),
-                "confidence": 0.9,
-                "keywords": ["onboarding", "new hire", "welcome", "training", "setup"]
-            },
-            "culture": {
-                "content": """
+        "source": "https://handbook.gitlab.com/handbook/people-group/general-onboarding/",
+        "last_updated": _DEFAULT_KB_TIMESTAMP,
+        "confidence": 0.9,
+        "keywords": ["onboarding", "new hire", "welcome", "training", "setup"]
+    },
+    "culture": {
+        "content": """
                 GitLab's company culture is built on transparency and collaboration:
                 - Transparency: All company information is public by default, fostering trust
                 - Collaboration: Cross-functional teamwork and open communication
@@ -63,13 +150,13 @@ class EnhancedGitLabService:
                 - Strong emphasis on work-life balance and mental health
                 - Building in public philosophy with transparent decision-making
                 """,
-                "source": "https://handbook.gitlab.com/handbook/values/",
-                "last_updated": datetime.now().isoformat(),
-                "confidence": 0.95,
-                "keywords": ["culture", "values", "transparency", "collaboration", "remote"]
-            },
-            "remote_work": {
-                "content": """
+        "source": "https://handbook.gitlab.com/handbook/values/",
+        "last_updated": _DEFAULT_KB_TIMESTAMP,
+        "confidence": 0.95,
+        "keywords": ["culture", "values", "transparency", "collaboration", "remote"]
+    },
+    "remote_work": {
+        "content": """
                 GitLab's remote work philosophy and practices:
                 - Fully remote company since 2011 with no physical offices
                 - Asynchronous communication is preferred over real-time meetings
@@ -82,13 +169,13 @@ class EnhancedGitLabService:
                 - Remote-friendly processes for hiring, onboarding, and collaboration
                 - Continuous investment in remote work infrastructure and best practices
                 """,
-                "source": "https://handbook.gitlab.com/company/culture/all-remote/",
-                "last_updated": datetime.now().isoformat(),
-                "confidence": 0.92,
-                "keywords": ["remote", "work from home", "distributed", "async", "flexible"]
-            },
-            "performance": {
-                "content": """
+        "source": "https://handbook.gitlab.com/company/culture/all-remote/",
+        "last_updated": _DEFAULT_KB_TIMESTAMP,
+        "confidence": 0.92,
+        "keywords": ["remote", "work from home", "distributed", "async", "flexible"]
+    },
+    "performance": {
+        "content": """
                 GitLab's performance management and development approach:
                 - Quarterly performance review cycles with clear expectations
                 - Comprehensive 360-degree feedback from peers, reports, and managers
@@ -101,13 +188,13 @@ class EnhancedGitLabService:
                 - Continuous learning culture with training stipends and resources
                 - Manager training programs to support effective people leadership
                 """,
-                "source": "https://handbook.gitlab.com/handbook/people-group/performance-and-development/",
-                "last_updated": datetime.now().isoformat(),
-                "confidence": 0.88,
-                "keywords": ["performance", "review", "feedback", "development", "promotion"]
-            },
-            "product_strategy": {
-                "content": """
+        "source": "https://handbook.gitlab.com/handbook/people-group/performance-and-development/",
+        "last_updated": _DEFAULT_KB_TIMESTAMP,
+        "confidence": 0.88,
+        "keywords": ["performance", "review", "feedback", "development", "promotion"]
+    },
+    "product_strategy": {
+        "content": """
                 GitLab's product strategy and vision:
                 - Single DevOps platform consolidating the entire software development lifecycle
                 - Strong commitment to open source community and contribution
@@ -120,77 +207,195 @@ class EnhancedGitLabService:
                 - Continuous innovation through R&D and community feedback
                 - Platform scalability to serve enterprises of all sizes
                 """,
-                "source": "https://about.gitlab.com/direction/",
-                "last_updated": datetime.now().isoformat(),
-                "confidence": 0.85,
-                "keywords": ["product", "strategy", "devops", "platform", "direction"]
-            }
+        "source": "https://about.gitlab.com/direction/",
+        "last_updated": _DEFAULT_KB_TIMESTAMP,
+        "confidence": 0.85,
+        "keywords": ["product", "strategy", "devops", "platform", "direction"]
+    }
+}
+
+class EnhancedGitLabService:
+    def __init__(self):
+        self.knowledge_base = self.load_knowledge_base()
+        self.last_update = self.get_last_update()
+        self.update_interval = timedelta(days=settings.update_interval_days)
+        self._update_lock = threading.Lock()
+        self._stop_updates = threading.Event()
+
+        # Rankings depend only on the normalized query, so repeated questions skip scoring
+        self.rank_topics = functools.lru_cache(maxsize=512)(self._rank_topics)
+        self.build_index()
+
+    def build_index(self):
+        """Build the word index and prompt context blocks for the current knowledge base"""
+        word_index = defaultdict(set)
+        for topic, data in self.knowledge_base.items():
+            for word in set(_tokens(data['content'])):
+                word_index[word].add(topic)
+        self.word_index = dict(word_index)
+
+        # Queries are matched lowercased, so keywords are too; scraped updates may not be
+        self.topic_keywords = {
+            topic: frozenset(keyword.lower() for keyword in data.get('keywords', []))
+            for topic, data in self.knowledge_base.items()
         }
 
+        # Keyword matching runs as one regex pass over the query; the lookahead lets
+        # overlapping keywords match, longest first at each position
+        keyword_topics = defaultdict(set)
+        for topic, keywords in self.topic_keywords.items():
+            for keyword in keywords:
+                keyword_topics[keyword].add(topic)
+        self.keyword_topics = dict(keyword_topics)
+        self.keyword_re = re.compile("(?=({}))".format("|".join(
+            map(re.escape, sorted(self.keyword_topics, key=len, reverse=True))
+        )))
+        # A match also implies every keyword that is a prefix of it at the same position
+        self.keyword_prefixes = {
+            keyword: [other for other in self.keyword_topics if keyword.startswith(other)]
+            for keyword in self.keyword_topics
+        }
+
+        # Topic names as users would type them, e.g. "remote work" for remote_work
+        self.topic_phrases = {
+            topic: {topic, topic.replace('_', ' ')} for topic in self.knowledge_base
+        }
+
+        # Per-topic scoring inputs that only change with the knowledge base
+        self.topic_profiles = {
+            topic: (len(self.topic_keywords[topic]), data.get('confidence', 0.5))
+            for topic, data in self.knowledge_base.items()
+        }
+
+        # Prompt context blocks never change between queries, so build them once,
+        # trimmed so a full set of sources stays within the context budget
+        words_per_source = settings.max_context_length // settings.max_sources_per_response
+        self.context_blocks = {
+            topic: (
+                f"Source: {data['source']}\nTopic: {topic}\n"
+                f"Content: {_truncate_words(data['content'], words_per_source)}\n"
+            )
+            for topic, data in self.knowledge_base.items()
+        }
+        self.rank_topics.cache_clear()
+
+    def load_knowledge_base(self) -> Dict:
+        """Load knowledge base from session state, the saved copy on disk, or use default"""
+        # The service is shared across sessions and refreshed in place from a background
+        # thread, so it keeps its own copy rather than the session's dict
+        if 'gitlab_knowledge_base' in st.session_state:
+            return copy.deepcopy(st.session_state.gitlab_knowledge_base)
+
+        kb_path = Path(settings.knowledge_base_path)
+        if kb_path.is_file():
+            try:
+                saved = orjson.loads(kb_path.read_bytes())
+                st.session_state.gitlab_knowledge_base = copy.deepcopy(saved['knowledge_base'])
+                st.session_state.last_knowledge_update = saved['last_update']
+                return saved['knowledge_base']
+            except Exception as e:
+                logger.error(f"Error loading saved knowledge base: {e}")
+
+        st.session_state.gitlab_knowledge_base = self.get_default_knowledge_base()
+        return self.get_default_knowledge_base()
+
+    def save_knowledge_base(self) -> None:
+        """Snapshot the knowledge base and its update time, then write it to disk in the background"""
+        payload = orjson.dumps(
+            {'last_update': self.last_update.isoformat(), 'knowledge_base': self.knowledge_base},
+            option=orjson.OPT_INDENT_2
+        )
+        threading.Thread(
+            target=self._write_knowledge_base, args=(payload,), name="kb-writer", daemon=True
+        ).start()
+
+    @staticmethod
+    def _write_knowledge_base(payload: bytes) -> None:
+        """Replace the saved knowledge base atomically, so readers never see a partial file"""
+        try:
+            kb_path = Path(settings.knowledge_base_path)
+            tmp_path = kb_path.with_name(kb_path.name + '.tmp')
+            with _kb_write_lock:
+                kb_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path.write_bytes(payload)
+                os.replace(tmp_path, kb_path)
+        except Exception as e:
+            logger.error(f"Error saving knowledge base: {e}")
+
+    def get_default_knowledge_base(self) -> Dict:
+        """Enhanced default knowledge base with metadata"""
+        # Entries are updated in place, so every caller gets its own copy
+        return copy.deepcopy(DEFAULT_KNOWLEDGE_BASE)
+
     def get_last_update(self) -> datetime:
         """Get when knowledge base was last updated"""
         if 'last_knowledge_update' in st.session_state:
             return datetime.fromisoformat(st.session_state.last_knowledge_update)
+        # The built-in entries are stale by design: the background updater refreshes
+        # a fresh install once, off the request path, and saves the real timestamp
         return datetime.now() - timedelta(days=30)  # Force initial update
 
     def should_update(self) -> bool:
         """Check if knowledge base needs updating"""
         return datetime.now() - self.last_update > self.update_interval
 
-    def calculate_relevance_score(self, query: str, content_item: Dict) -> float:
-        """Calculate how relevant a content item is to the query"""
-        query_lower = query.lower()
-        content_text = content_item['content'].lower()
-        keywords = content_item.get('keywords', [])
-
-        # Keyword matching score
-        keyword_matches = sum(1 for keyword in keywords if keyword in query_lower)
-        keyword_score = min(keyword_matches / len(keywords), 1.0) if keywords else 0
-
-        # Content relevance score (simple word matching)
-        query_words = set(query_lower.split())
-        content_words = set(content_text.split())
-        common_words = query_words.intersection(content_words)
-        content_score = len(common_words) / max(len(query_words), 1)
-
-        # Base confidence from content quality
-        base_confidence = content_item.get('confidence', 0.5)
-
-        # Combined score
-        relevance = (keyword_score * 0.5 + content_score * 0.3 + base_confidence * 0.2)
-        return min(relevance, 1.0)
+    def count_common_words(self, query: str) -> Counter:
+        """Count, per topic, how many distinct query words appear in its content"""
+        query_words = set(_tokens(query))
+        return Counter(
+            topic for word in query_words for topic in self.word_index.get(word, ())
+        )
+
+    def count_keyword_matches(self, query: str) -> Counter:
+        """Count, per topic, how many of its keywords appear anywhere in the query"""
+        matched_keywords = set()
+        for match in self.keyword_re.finditer(query.lower()):
+            matched_keywords.update(self.keyword_prefixes.get(match.group(1), ()))
+        return Counter(
+            topic for keyword in matched_keywords for topic in self.keyword_topics[keyword]
+        )
 
     def get_content_for_query(self, query: str) -> List[Dict[str, Any]]:
         """Get relevant content for a query with enhanced scoring"""
-        # Check if we need to update (optional - can be triggered manually)
-        update_available = self.should_update()
-
-        # Calculate relevance scores for all content
-        scored_content = []
-        for key, data in self.knowledge_base.items():
-            score = self.calculate_relevance_score(query, data)
-            if score > 0.1:  # Only include somewhat relevant content
-                content_with_score = data.copy()
-                content_with_score['relevance_score'] = score
-                content_with_score['topic'] = key
-                scored_content.append(content_with_score)
+        ranked_topics = self.rank_topics(" ".join(query.lower().split()))
+        scored_content = [
+            {**self.knowledge_base[topic], 'relevance_score': score, 'topic': topic}
+            for topic, score in ranked_topics
+        ]
 
-        # Sort by relevance and return top 3
-        scored_content.sort(key=lambda x: x['relevance_score'], reverse=True)
-
-        # If no good matches, return default culture/values content
+        # If no good matches, fall back to the culture overview without touching the stored entry
         if not scored_content:
-            default_content = [
-                self.knowledge_base.get('culture', {}),
-                self.knowledge_base.get('values', {})
-            ]
-            for i, content in enumerate(default_content):
-                if content:
-                    content['relevance_score'] = 0.3
-                    content['topic'] = 'culture' if i == 0 else 'values'
-            return [c for c in default_content if c]
+            culture = self.knowledge_base.get('culture')
+            return [{**culture, 'relevance_score': 0.3, 'topic': 'culture'}] if culture else []
+
+        return scored_content
+
+    def _rank_topics(self, query: str) -> Tuple[Tuple[str, float], ...]:
+        """Score every topic against a normalized query and return the best as (topic, score)"""
+        # A query that names topics outright needs no scoring
+        direct_topics = [
+            topic for topic, phrases in self.topic_phrases.items()
+            if any(phrase in query for phrase in phrases)
+        ]
+        if direct_topics:
+            return tuple((topic, 1.0) for topic in direct_topics[:settings.max_sources_per_response])
+
+        # Calculate relevance scores for all content, using the indexes for word and keyword overlap
+        common_word_counts = self.count_common_words(query)
+        keyword_match_counts = self.count_keyword_matches(query)
+        query_word_count = max(len(set(_tokens(query))), 1)
+        scored_topics = []
+        for key, (keyword_count, base_confidence) in self.topic_profiles.items():
+            # Keyword coverage weighs most, then query words found in the content, then source quality
+            keyword_score = min(keyword_match_counts[key] / keyword_count, 1.0) if keyword_count else 0
+            content_score = common_word_counts[key] / query_word_count
+            score = min(keyword_score * 0.5 + content_score * 0.3 + base_confidence * 0.2, 1.0)
+            if score > 0.1:  # Only include somewhat relevant content
+                scored_topics.append((key, score))
 
-        return scored_content[:3]
+        # Sort by relevance and keep as many as a response may cite
+        scored_topics.sort(key=lambda x: x[1], reverse=True)
+        return tuple(scored_topics[:settings.max_sources_per_response])
 
     def generate_followup_questions(self, response: str, query: str, model) -> List[str]:
         """Generate contextual follow-up questions"""
@@ -198,7 +403,7 @@ class EnhancedGitLabService:
             followup_prompt = f"""
             Based on this GitLab-related conversation:
             User asked: "{query}"
-            Assistant responded: "{response[:300]}..."
+            Assistant responded: "{response[:FOLLOWUP_CONTEXT_CHARS]}..."
             
             Generate 3 relevant follow-up questions that a GitLab employee or someone interested in GitLab might ask.
             Make the questions specific and practical.
@@ -234,45 +439,54 @@ class EnhancedGitLabService:
         else:
             return "Low", "⚠️"
 
+    def refresh_knowledge_base(self) -> Dict[str, Any]:
+        """Fetch GitLab pages into the knowledge base; returns each page's text or exception"""
+        with self._update_lock:
+            results = asyncio.run(self._scrape_all(KNOWLEDGE_BASE_URLS))
+
+            # One timestamp for the whole update, shared by every refreshed entry
+            updated_at = datetime.now()
+            updated_at_iso = updated_at.isoformat()
+            updated_items = 0
+            for key, content in results.items():
+                if _is_usable_page(content) and key in self.knowledge_base:
+                    old_content = self.knowledge_base[key]
+                    self.knowledge_base[key].update({
+                        'content': content,
+                        'last_updated': updated_at_iso,
+                        'confidence': old_content.get('confidence', 0.8)
+                    })
+                    updated_items += 1
+
+            # Save updated knowledge base; a failed refresh leaves the schedule due
+            if updated_items > 0:
+                self.build_index()
+                self.last_update = updated_at
+                self.save_knowledge_base()
+            return results
+
     def update_knowledge_base_from_web(self) -> bool:
-        """Update knowledge base from GitLab pages (optional feature)"""
+        """Update knowledge base from GitLab pages and report progress in the page"""
         try:
             st.info("🔄 Updating knowledge base from GitLab pages...")
 
-            # URLs to scrape
-            urls = {
-                "onboarding": "https://handbook.gitlab.com/handbook/people-group/general-onboarding/",
-                "culture": "https://handbook.gitlab.com/handbook/values/",
-                "remote_work": "https://handbook.gitlab.com/company/culture/all-remote/",
-                "performance": "https://handbook.gitlab.com/handbook/people-group/performance-and-development/"
-            }
+            # Fetch every page concurrently, then report on each one
+            with st.spinner(f"Fetching {len(KNOWLEDGE_BASE_URLS)} GitLab pages..."):
+                results = self.refresh_knowledge_base()
 
             updated_items = 0
-            for key, url in urls.items():
-                try:
-                    with st.spinner(f"Updating {key}..."):
-                        content = self.scrape_gitlab_page(url)
-                        if content and len(content) > 100:  # Valid content
-                            # Update existing entry
-                            if key in self.knowledge_base:
-                                old_content = self.knowledge_base[key]
-                                self.knowledge_base[key].update({
-                                    'content': content,
-                                    'last_updated': datetime.now().isoformat(),
-                                    'confidence': old_content.get('confidence', 0.8)
-                                })
-                                updated_items += 1
-                            st.success(f"✅ Updated {key}")
-                        else:
-                            st.warning(f"⚠️ Could not update {key} - content too short")
-
-                except Exception as e:
-                    st.error(f"❌ Failed to update {key}: {str(e)}")
-                    continue
-
-            # Save updated knowledge base
-            st.session_state.gitlab_knowledge_base = self.knowledge_base
-            st.session_state.last_knowledge_update = datetime.now().isoformat()
+            for key, content in results.items():
+                if isinstance(content, Exception):
+                    st.error(f"❌ Failed to update {key}: {str(content)}")
+                elif _is_usable_page(content):
+                    if key in self.knowledge_base:
+                        updated_items += 1
+                    st.success(f"✅ Updated {key}")
+                else:
+                    st.warning(f"⚠️ Could not update {key} - content too short")
+
+            st.session_state.gitlab_knowledge_base = copy.deepcopy(self.knowledge_base)
+            st.session_state.last_knowledge_update = self.last_update.isoformat()
 
             if updated_items > 0:
                 st.success(f"✅ Successfully updated {updated_items} knowledge base entries!")
@@ -285,49 +499,118 @@ class EnhancedGitLabService:
             st.error(f"❌ Error updating knowledge base: {str(e)}")
             return False
 
-    def scrape_gitlab_page(self, url: str) -> Optional[str]:
-        """Scrape content from a GitLab page"""
-        headers = {
-            'User-Agent': 'GitLab GenAI Chatbot (Educational Purpose)'
-        }
+    def start_background_updates(self) -> None:
+        """Refresh the knowledge base on a daemon thread whenever the update interval passes"""
+        global _active_updater
+        if not settings.enable_web_scraping:
+            return
+        with _updater_lock:
+            if _active_updater is not None:
+                _active_updater.stop_background_updates()
+            _active_updater = self
+        threading.Thread(target=self._background_update_loop, name="kb-updater", daemon=True).start()
+
+    def stop_background_updates(self) -> None:
+        """Ask the background updater to exit at its next wake-up"""
+        self._stop_updates.set()
+
+    def _background_update_loop(self) -> None:
+        """Sleep until the next update is due, refresh, and repeat until stopped"""
+        while not self._stop_updates.is_set():
+            wait_seconds = (self.last_update + self.update_interval - datetime.now()).total_seconds()
+            if wait_seconds > 0:
+                # Re-checked on waking, since a manual update may have moved the schedule
+                self._stop_updates.wait(wait_seconds)
+                continue
+
+            try:
+                self.refresh_knowledge_base()
+            except Exception as e:
+                logger.error(f"Background knowledge base update failed: {e}")
+
+            if self.should_update():
+                self._stop_updates.wait(UPDATE_RETRY_SECONDS)
+
+    async def _scrape_all(self, urls: Dict[str, str]) -> Dict[str, Any]:
+        """Fetch and extract all pages concurrently; failed pages map to their exception"""
+        # Requests waiting for a pooled connection would burn their timeout, so the
+        # semaphore keeps them queued before the request starts instead
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        connector = aiohttp.TCPConnector(
+            limit=MAX_CONCURRENT_FETCHES * 2,
+            limit_per_host=MAX_CONCURRENT_FETCHES,
+            ttl_dns_cache=300
+        )
+        async with aiohttp.ClientSession(
+            headers=_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=settings.request_timeout),
+            connector=connector
+        ) as session:
+            pages = await asyncio.gather(
+                *(self._fetch_page(session, semaphore, url) for url in urls.values()),
+                return_exceptions=True
+            )
+
+        results = {}
+        for (key, url), page in zip(urls.items(), pages):
+            if isinstance(page, Exception):
+                logger.error(f"Error scraping {url}: {page}")
+                results[key] = page
+            else:
+                results[key] = self.extract_page_text(page)
+        return results
 
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
+    async def _fetch_page(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                          url: str) -> bytes:
+        """Download a page, stopping as soon as its <main> element has arrived"""
+        async with semaphore, session.get(url) as response:
             response.raise_for_status()
+            reader = _MainSectionReader(response.charset)
+            async for chunk in response.content.iter_chunked(PAGE_CHUNK_BYTES):
+                if reader.feed(chunk):
+                    break
+            return reader.page()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'header', 'footer']):
-                element.decompose()
-
-            # Extract main content
-            content_selectors = [
-                'main', '.content', '.handbook-content',
-                '.markdown-body', 'article', '.post-content'
-            ]
+    def extract_page_text(self, page: bytes) -> Optional[str]:
+        """Extract the readable text of a GitLab page"""
+        try:
+            # Most GitLab pages wrap their text in <main>, so parse only that
+            # subtree first and fall back to the full document otherwise
+            soup = BeautifulSoup(page, 'lxml', parse_only=SoupStrainer('main'))
+            if soup.main is None:
+                soup = BeautifulSoup(page, 'lxml')
 
+            # Extract main content, stripping page chrome only inside the chosen container
             content = ""
-            for selector in content_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    content = elements[0].get_text(strip=True, separator=' ')
+            for selector in _CONTENT_SELECTORS:
+                element = selector.select_one(soup)
+                if element is not None:
+                    content = self._visible_text(element)
                     break
 
             # If no structured content found, get body text
             if not content:
-                content = soup.get_text(strip=True, separator=' ')
+                content = self._visible_text(soup)
 
             # Clean and limit content
             content = ' '.join(content.split())  # Normalize whitespace
             return content[:3000] if content else None  # Limit to 3000 chars
 
         except Exception as e:
-            logger.error(f"Error scraping {url}: {e}")
+            logger.error(f"Error parsing page: {e}")
             return None
 
+    @staticmethod
+    def _visible_text(element) -> str:
+        """Text of an element without its scripts, styles, and navigation"""
+        for unwanted in element(_STRIPPED_TAGS):
+            unwanted.decompose()
+        return element.get_text(strip=True, separator=' ')
+
 # Global service instance
-@st.cache_resource
+@st.cache_resource(show_spinner="Loading GitLab knowledge base…")
 def get_gitlab_service():
-    """Get or create the GitLab service instance"""
-    return EnhancedGitLabService()
\ No newline at end of file
+    """Get or create the GitLab service instance, with its background updater running"""
+    service = EnhancedGitLabService()
+    service.start_background_updates()
+    return service
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+Cache of generated responses, shared across Streamlit sessions and optionally persisted to disk
+"""
+import hashlib
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of generated responses with a time-to-live"""
+
+    def __init__(self, max_entries: int = 500, ttl_seconds: int = 86400, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        # Disk writes are queued for a background thread, off the script thread
+        self._writes: "queue.Queue[Tuple[str, list]]" = queue.Queue()
+        if path:
+            self._open_db(path)
+
+    @staticmethod
+    def make_key(prompt: str) -> str:
+        """Hash the full prompt so query, context, and history all take part in the key"""
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Return the cached response for a prompt, or None if missing or expired"""
+        key = self.make_key(prompt)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            stored_at, response = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self._delete_rows([key])
+                return None
+
+            self._entries.move_to_end(key)
+            return response
+
+    def set(self, prompt: str, response: str) -> None:
+        """Store a response, evicting the least recently used entries past the limit"""
+        key = self.make_key(prompt)
+        stored_at = time.time()
+        with self._lock:
+            self._entries[key] = (stored_at, response)
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+
+            if self._db is not None:
+                self._writes.put((
+                    "INSERT OR REPLACE INTO responses (key, stored_at, response) VALUES (?, ?, ?)",
+                    [(key, stored_at, response)]
+                ))
+            self._delete_rows(evicted)
+
+    def flush(self) -> None:
+        """Wait until every queued write has reached the on-disk store"""
+        self._writes.join()
+
+    def _open_db(self, path: str) -> None:
+        """Open the on-disk store and load its unexpired entries, newest last"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, stored_at REAL NOT NULL, response TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "DELETE FROM responses WHERE stored_at < ?", (time.time() - self.ttl_seconds,)
+            )
+
+        rows = self._db.execute(
+            "SELECT key, stored_at, response FROM responses ORDER BY stored_at DESC LIMIT ?",
+            (self.max_entries,)
+        ).fetchall()
+        for key, stored_at, response in reversed(rows):
+            self._entries[key] = (stored_at, response)
+
+        threading.Thread(target=self._write_rows, name="response-cache-writer", daemon=True).start()
+
+    def _write_rows(self) -> None:
+        """Apply queued writes to the on-disk store in order"""
+        while True:
+            statement, rows = self._writes.get()
+            try:
+                with self._db:
+                    self._db.executemany(statement, rows)
+            except sqlite3.Error as e:
+                logger.error(f"Error writing response cache: {e}")
+            finally:
+                self._writes.task_done()
+
+    def _delete_rows(self, keys) -> None:
+        """Queue entries for removal from the on-disk store; callers hold the lock"""
+        if self._db is not None and keys:
+            self._writes.put(("DELETE FROM responses WHERE key = ?", [(key,) for key in keys]))
@@ -0,0 +1,75 @@
+"""
+Semantic answer cache that matches near-duplicate questions by embedding similarity
+"""
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """LRU cache of answers looked up by cosine similarity of question embeddings"""
+
+    def __init__(self, encoder, threshold: float = 0.92, max_entries: int = 100):
+        self.encoder = encoder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._embeddings: Optional[np.ndarray] = None  # [N, d] unit-length rows
+        self._context_keys: List[str] = []
+        self._answers: List[str] = []
+        self._last_used: List[int] = []
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def encode(self, text: str) -> np.ndarray:
+        """Embed a question as a normalized float32 vector"""
+        embedding = self.encoder.encode(text, normalize_embeddings=True)
+        return np.asarray(embedding, dtype=np.float32)
+
+    def lookup(self, embedding: np.ndarray, context_key: str) -> Optional[str]:
+        """Return the stored answer most similar to the question, if it clears the threshold"""
+        with self._lock:
+            if not self._answers:
+                return None
+
+            # Rows are unit vectors, so one matrix-vector product gives every cosine similarity
+            similarities = self._embeddings @ embedding
+
+            # Answers only transfer between questions asked in the same conversation context
+            same_context = np.array([key == context_key for key in self._context_keys])
+            similarities = np.where(same_context, similarities, -1.0)
+
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+
+            self._touch(best)
+            return self._answers[best]
+
+    def add(self, embedding: np.ndarray, context_key: str, answer: str) -> None:
+        """Store an answer, replacing the least recently used one when full"""
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = embedding[np.newaxis, :]
+                slot = 0
+                self._context_keys.append(context_key)
+                self._answers.append(answer)
+                self._last_used.append(0)
+            elif len(self._answers) < self.max_entries:
+                self._embeddings = np.vstack([self._embeddings, embedding])
+                slot = len(self._answers)
+                self._context_keys.append(context_key)
+                self._answers.append(answer)
+                self._last_used.append(0)
+            else:
+                slot = int(np.argmin(self._last_used))
+                self._embeddings[slot] = embedding
+                self._context_keys[slot] = context_key
+                self._answers[slot] = answer
+
+            self._touch(slot)
+
+    def _touch(self, slot: int) -> None:
+        """Mark an entry as most recently used"""
+        self._clock += 1
+        self._last_used[slot] = self._clock
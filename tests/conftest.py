@@ -0,0 +1,10 @@
+import pytest
+
+from enhanced_gitlab_service import EnhancedGitLabService
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """A service over the built-in knowledge base, kept away from any saved copy"""
+    monkeypatch.chdir(tmp_path)
+    return EnhancedGitLabService()
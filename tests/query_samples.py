@@ -0,0 +1,19 @@
+"""Seeded random queries for checking fast matchers against plain scans"""
+import random
+
+# Fragments that make overlapping, adjacent, and partial keyword hits likely
+FRAGMENTS = ["interview", "reviews", "team", "teams", "remote", "work from home", "new hire",
+             "start", "restart", "product", "strategy", "async", "the", "at", "gitlab", "?", "-"]
+SEPARATORS = [" ", "", "  ", ", ", "\t"]
+
+
+def random_queries(vocabulary, count=500, seed=7):
+    rng = random.Random(seed)
+    for _ in range(count):
+        words = rng.choices(vocabulary, k=rng.randint(1, 8))
+        query = ""
+        for word in words:
+            if rng.random() < 0.3:
+                word = word.upper() if rng.random() < 0.5 else word.title()
+            query += word + rng.choice(SEPARATORS)
+        yield query
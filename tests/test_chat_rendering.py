@@ -0,0 +1,29 @@
+from app import _BULLET_RE
+
+
+def render_bullets(content):
+    return _BULLET_RE.sub("• ", content)
+
+
+def test_star_bullets_become_dots():
+    assert render_bullets("Values:\n* Collaboration\n*Results") == "Values:\n• Collaboration\n• Results"
+
+
+def test_indented_bullets_are_normalized():
+    assert render_bullets("  *   Transparency\n\t* Iteration") == "• Transparency\n• Iteration"
+
+
+def test_bold_and_inline_stars_are_kept():
+    content = "**Efficiency** matters\nA * B is not a bullet"
+    assert render_bullets(content) == content
+
+
+def test_matches_line_by_line_rewrite_on_bullets():
+    lines = ["* one", "   *two  ", "**bold**", "plain", "*", "* * nested"]
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith('*') and not stripped.startswith('**'):
+            # Trailing spaces survive the regex; only the bullet prefix is rewritten
+            assert render_bullets(line).rstrip() == f"• {stripped[1:].strip()}".rstrip()
+        else:
+            assert render_bullets(line) == line
@@ -0,0 +1,24 @@
+from config import get_settings
+
+
+def test_named_topic_is_returned_directly(service):
+    ranked = service.get_content_for_query("Tell me about remote work")
+    assert ranked[0]['topic'] == 'remote_work'
+    assert ranked[0]['relevance_score'] == 1.0
+
+
+def test_topic_key_spelling_is_recognized(service):
+    assert [item['topic'] for item in service.get_content_for_query("remote_work?")] == ['remote_work']
+
+
+def test_named_topics_are_capped(service):
+    query = "onboarding, culture, remote work, performance and product"
+    ranked = service.get_content_for_query(query)
+    assert len(ranked) == get_settings().max_sources_per_response
+    assert all(item['relevance_score'] == 1.0 for item in ranked)
+
+
+def test_unnamed_topics_are_scored(service):
+    ranked = service.get_content_for_query("How are reviews and feedback given?")
+    assert ranked
+    assert all(item['relevance_score'] < 1.0 for item in ranked)
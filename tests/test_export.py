@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import orjson
+import pytest
+import streamlit as st
+
+import app
+
+
+class FixedClock(datetime):
+    """datetime whose now() is set by the test"""
+    current = datetime(2026, 1, 2, 3, 4, 5)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+@pytest.fixture
+def conversation(monkeypatch):
+    monkeypatch.setattr(FixedClock, "current", datetime(2026, 1, 2, 3, 4, 5))
+    monkeypatch.setattr(app, "datetime", FixedClock)
+    st.session_state.chat_history = [
+        {"role": "user", "content": "Quote {export_timestamp} back", "_short": "Quote",
+         "timestamp": "2026-01-01T00:00:00"},
+        {"role": "assistant", "content": "{export_timestamp}", "_short": "x", "sources": [],
+         "timestamp": "2026-01-01T00:00:01"},
+    ]
+    st.session_state.conversation_stats = {'total_queries': 1, 'topics_discussed': set()}
+    st.session_state.show_sources = True
+    st.session_state.show_confidence = True
+    st.session_state.show_followups = True
+    yield
+    for key in ("chat_history", "conversation_stats", "show_sources", "show_confidence",
+                "show_followups", "export_cache"):
+        st.session_state.pop(key, None)
+
+
+def test_export_is_stamped_at_render_time(conversation):
+    json_bytes, text_export = app.get_export_payloads()
+    export = orjson.loads(json_bytes)
+    assert export["metadata"]["export_timestamp"] == "2026-01-02T03:04:05"
+    assert "Generated: 2026-01-02 03:04:05" in text_export
+
+    cached = st.session_state.export_cache
+    FixedClock.current = datetime(2026, 1, 2, 4, 0, 0)
+    json_bytes, text_export = app.get_export_payloads()
+    assert st.session_state.export_cache is cached
+    assert orjson.loads(json_bytes)["metadata"]["export_timestamp"] == "2026-01-02T04:00:00"
+    assert "Generated: 2026-01-02 04:00:00" in text_export
+
+
+def test_placeholder_text_in_messages_is_kept(conversation):
+    export = orjson.loads(app.get_export_payloads()[0])
+    assert export["conversation"][0]["content"] == "Quote {export_timestamp} back"
+    assert export["conversation"][1]["content"] == "{export_timestamp}"
+    assert "_short" not in export["conversation"][0]
@@ -0,0 +1,51 @@
+PAGE = b"""<html><head><title>Values</title><style>p { color: red }</style></head>
+<body>
+<header>Site header</header>
+<nav>Menu</nav>
+<main>
+  <h1>GitLab Values</h1>
+  <script>track()</script>
+  <p>Collaboration,   results and
+     transparency.</p>
+  <footer>Edit this page</footer>
+</main>
+<footer>Site footer</footer>
+</body></html>"""
+
+CONTENT_PAGE = b"""<html><body>
+<nav>Menu</nav>
+<div class="content"><p>Handbook content</p><nav>Table of contents</nav></div>
+<p>Outside the content</p>
+</body></html>"""
+
+BARE_PAGE = b"""<html><body>
+<header>Site header</header>
+<p>Only   body text</p>
+<script>track()</script>
+</body></html>"""
+
+
+def test_main_text_without_its_chrome(service):
+    assert service.extract_page_text(PAGE) == "GitLab Values Collaboration, results and transparency."
+
+
+def test_main_is_preferred_over_other_containers(service):
+    page = b'<body><div class="content">Sidebar</div><main><p>Main text</p></main></body>'
+    assert service.extract_page_text(page) == "Main text"
+
+
+def test_falls_back_to_content_container(service):
+    assert service.extract_page_text(CONTENT_PAGE) == "Handbook content"
+
+
+def test_falls_back_to_body_text(service):
+    assert service.extract_page_text(BARE_PAGE) == "Only body text"
+
+
+def test_limits_length(service):
+    page = b"<main><p>" + b"word " * 1000 + b"</p></main>"
+    assert len(service.extract_page_text(page)) == 3000
+
+
+def test_empty_page(service):
+    assert service.extract_page_text(b"<html><body><main><script>x()</script></main></body></html>") is None
@@ -0,0 +1,58 @@
+from enhanced_gitlab_service import _MainSectionReader
+
+PAGE = b"""<html><head><title>Values</title><style>p { color: red }</style></head>
+<body>
+<header>Site header</header>
+<nav>Menu</nav>
+<main>
+  <h1>GitLab Values</h1>
+  <script>track()</script>
+  <p>Collaboration,   results and
+     transparency.</p>
+  <footer>Edit this page</footer>
+</main>
+<footer>Site footer</footer>
+</body></html>"""
+
+NO_MAIN_PAGE = b"""<html><body>
+<nav>Menu</nav>
+<div class="content"><p>Handbook content</p><nav>Table of contents</nav></div>
+<p>Outside the content</p>
+</body></html>"""
+
+
+def feed_in_chunks(reader, page, size=16):
+    """Feed a page like a download; returns how many bytes were read before stopping"""
+    for start in range(0, len(page), size):
+        if reader.feed(page[start:start + size]):
+            return start + size
+    return len(page)
+
+
+def test_reader_stops_after_main():
+    reader = _MainSectionReader()
+    read = feed_in_chunks(reader, PAGE)
+    assert read < len(PAGE)
+    main_html = reader.page()
+    assert main_html.startswith(b"<main>")
+    assert b"GitLab Values" in main_html
+    assert b"Site footer" not in main_html
+
+
+def test_reader_returns_whole_page_without_main():
+    reader = _MainSectionReader()
+    assert feed_in_chunks(reader, NO_MAIN_PAGE) == len(NO_MAIN_PAGE)
+    assert reader.page() == NO_MAIN_PAGE
+
+
+def test_reader_decodes_declared_charset(service):
+    page = "<html><body><main><p>Café culture</p></main></body></html>".encode("latin-1")
+    reader = _MainSectionReader("iso-8859-1")
+    feed_in_chunks(reader, page)
+    assert service.extract_page_text(reader.page()) == "Café culture"
+
+
+def test_extracted_text_is_the_same_as_from_the_whole_page(service):
+    reader = _MainSectionReader()
+    feed_in_chunks(reader, PAGE)
+    assert service.extract_page_text(reader.page()) == service.extract_page_text(PAGE)
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+import streamlit as st
+
+import app
+
+SERVICE = SimpleNamespace(context_blocks={
+    "culture": "Source: values\nTopic: culture\nContent: CREDIT\n",
+    "onboarding": "Source: onboarding\nTopic: onboarding\nContent: Welcome\n",
+})
+
+CULTURE = {"topic": "culture", "source": "values", "content": "CREDIT", "relevance_score": 0.9}
+ONBOARDING = {"topic": "onboarding", "source": "onboarding", "content": "Welcome", "relevance_score": 0.5}
+HIRING = {"topic": "hiring", "source": "jobs", "content": "Interviews", "relevance_score": 0.4}
+
+
+@pytest.fixture
+def history():
+    st.session_state.chat_history = []
+    yield st.session_state.chat_history
+    st.session_state.pop("chat_history", None)
+
+
+def static_prefix(prompt):
+    return prompt.split("Relevance scores")[0]
+
+
+def test_static_parts_come_first_and_question_last(history):
+    history.extend([
+        {"role": "user", "_short": "What are the values?"},
+        {"role": "assistant", "_short": "CREDIT"},
+    ])
+    prompt = app.build_enhanced_prompt(SERVICE, "And onboarding?", [CULTURE])
+    assert prompt.startswith(app.SYSTEM_PROMPT)
+    positions = [prompt.index(part) for part in (
+        "Content: CREDIT", "Recent conversation:", "Relevance scores", "Current User Question: And onboarding?"
+    )]
+    assert positions == sorted(positions)
+    assert prompt.rstrip().endswith("Answer:")
+
+
+def test_context_order_does_not_depend_on_ranking(history):
+    first = app.build_enhanced_prompt(SERVICE, "q", [CULTURE, ONBOARDING])
+    second = app.build_enhanced_prompt(SERVICE, "q", [ONBOARDING, CULTURE])
+    assert static_prefix(first) == static_prefix(second)
+    assert first.index("Topic: culture") < first.index("Topic: onboarding")
+
+
+def test_duplicate_topics_give_one_block(history):
+    prompt = app.build_enhanced_prompt(SERVICE, "q", [CULTURE, dict(CULTURE, relevance_score=0.3)])
+    assert prompt.count("Topic: culture") == 1
+
+
+def test_topics_without_a_prebuilt_block_are_formatted_inline(history):
+    prompt = app.build_enhanced_prompt(SERVICE, "q", [HIRING])
+    assert "Source: jobs\nTopic: hiring\nContent: Interviews\n" in prompt
+
+
+def test_single_message_history_is_left_out(history):
+    history.append({"role": "user", "_short": "Hi"})
+    assert "Recent conversation:" not in app.build_enhanced_prompt(SERVICE, "q", [CULTURE])
@@ -0,0 +1,54 @@
+import response_cache
+from response_cache import ResponseCache
+
+
+def test_set_and_get():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("prompt", "answer")
+    assert cache.get("prompt") == "answer"
+    assert cache.get("other prompt") is None
+
+
+def test_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("prompt", "answer")
+    now[0] += 61
+    assert cache.get("prompt") is None
+
+
+def test_reloads_from_disk(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = ResponseCache(max_entries=2, ttl_seconds=60, path=path)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.set("c", "3")
+    cache.flush()
+
+    reloaded = ResponseCache(max_entries=2, ttl_seconds=60, path=path)
+    assert reloaded.get("a") is None
+    assert reloaded.get("b") == "2"
+    assert reloaded.get("c") == "3"
+
+
+def test_reload_skips_expired_rows(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    path = str(tmp_path / "responses.sqlite3")
+    cache = ResponseCache(ttl_seconds=60, path=path)
+    cache.set("prompt", "answer")
+    cache.flush()
+    now[0] += 61
+    assert ResponseCache(ttl_seconds=60, path=path).get("prompt") is None
@@ -0,0 +1,22 @@
+from tests.query_samples import FRAGMENTS, random_queries
+
+
+def baseline_keyword_matches(service, query):
+    """Per-topic keyword counts as a plain substring scan over the lowercased query"""
+    query_lower = query.lower()
+    counts = {}
+    for topic, data in service.knowledge_base.items():
+        keywords = {keyword.lower() for keyword in data.get('keywords', [])}
+        matches = sum(1 for keyword in keywords if keyword in query_lower)
+        if matches:
+            counts[topic] = matches
+    return counts
+
+
+def test_keyword_counts_match_substring_scan(service):
+    vocabulary = FRAGMENTS + [
+        keyword for data in service.knowledge_base.values() for keyword in data['keywords']
+    ]
+    for query in random_queries(vocabulary):
+        assert dict(service.count_keyword_matches(query)) == baseline_keyword_matches(service, query), query
+
@@ -0,0 +1,53 @@
+import numpy as np
+
+from semantic_cache import SemanticCache
+
+
+class FakeEncoder:
+    """Maps known questions to fixed unit vectors"""
+
+    VECTORS = {
+        "what are the values": [1.0, 0.0, 0.0],
+        "what are gitlab's values": [0.95, np.sqrt(1 - 0.95 ** 2), 0.0],
+        "how does onboarding work": [0.0, 1.0, 0.0],
+        "how is performance reviewed": [0.0, 0.0, 1.0],
+    }
+
+    def encode(self, text, normalize_embeddings=True):
+        return np.array(self.VECTORS[text])
+
+
+def make_cache(**kwargs):
+    return SemanticCache(FakeEncoder(), **kwargs)
+
+
+def test_matches_similar_question_above_threshold():
+    cache = make_cache(threshold=0.9)
+    cache.add(cache.encode("what are the values"), "ctx", "CREDIT")
+    assert cache.lookup(cache.encode("what are gitlab's values"), "ctx") == "CREDIT"
+    assert cache.lookup(cache.encode("how does onboarding work"), "ctx") is None
+
+
+def test_threshold_rejects_near_misses():
+    cache = make_cache(threshold=0.99)
+    cache.add(cache.encode("what are the values"), "ctx", "CREDIT")
+    assert cache.lookup(cache.encode("what are gitlab's values"), "ctx") is None
+
+
+def test_answers_stay_in_their_context():
+    cache = make_cache(threshold=0.9)
+    cache.add(cache.encode("what are the values"), "culture\n", "CREDIT")
+    assert cache.lookup(cache.encode("what are the values"), "onboarding\n") is None
+    assert cache.lookup(cache.encode("what are the values"), "culture\n") == "CREDIT"
+
+
+def test_replaces_least_recently_used_when_full():
+    cache = make_cache(threshold=0.9, max_entries=2)
+    cache.add(cache.encode("what are the values"), "ctx", "values")
+    cache.add(cache.encode("how does onboarding work"), "ctx", "onboarding")
+    cache.lookup(cache.encode("what are the values"), "ctx")
+    cache.add(cache.encode("how is performance reviewed"), "ctx", "performance")
+
+    assert cache.lookup(cache.encode("how does onboarding work"), "ctx") is None
+    assert cache.lookup(cache.encode("what are the values"), "ctx") == "values"
+    assert cache.lookup(cache.encode("how is performance reviewed"), "ctx") == "performance"
@@ -0,0 +1,26 @@
+from enhanced_gitlab_service import _tokens
+from tests.query_samples import FRAGMENTS, random_queries
+
+
+def test_punctuation_splits_words():
+    assert _tokens("What's GitLab's culture?") == ["what", "s", "gitlab", "s", "culture"]
+
+
+def test_underscores_and_case_are_ignored():
+    assert _tokens("Remote_Work STRASSE Straße") == ["remote", "work", "strasse", "strasse"]
+
+
+def test_digits_and_accents_are_kept():
+    assert _tokens("FY24 café") == ["fy24", "café"]
+
+
+def test_common_words_match_set_intersection(service):
+    vocabulary = FRAGMENTS + ["values", "onboarding", "feedback", "collaboration", "xyzzy"]
+    for query in random_queries(vocabulary, count=200):
+        query_words = set(_tokens(query))
+        expected = {
+            topic: len(query_words & set(_tokens(data['content'])))
+            for topic, data in service.knowledge_base.items()
+        }
+        counts = service.count_common_words(query)
+        assert {topic: counts[topic] for topic in expected} == expected, query
@@ -0,0 +1,28 @@
+from app import TOPIC_KEYWORDS, extract_topics_from_query
+from tests.query_samples import FRAGMENTS, random_queries
+
+
+def baseline_topics(query):
+    """Topics as a plain substring scan over the lowercased query"""
+    query_lower = query.lower()
+    topics = [
+        topic for topic, keywords in TOPIC_KEYWORDS.items()
+        if any(keyword in query_lower for keyword in keywords)
+    ]
+    return topics if topics else ["general"]
+
+
+def test_topic_regex_matches_substring_scan():
+    vocabulary = FRAGMENTS + [keyword for keywords in TOPIC_KEYWORDS.values() for keyword in keywords]
+    for query in random_queries(vocabulary):
+        assert extract_topics_from_query(query) == baseline_topics(query), query
+
+
+def test_overlapping_keywords_tag_every_topic():
+    assert extract_topics_from_query("Team reviews after the interview") == [
+        "performance", "hiring", "management"
+    ]
+
+
+def test_untagged_query_is_general():
+    assert extract_topics_from_query("What is the weather?") == ["general"]